@@ -1,11 +1,29 @@
+import itertools
 import logging
+import math
+import os
+import queue
+import re
 import shutil
 import threading
 from collections import defaultdict
+from contextlib import contextmanager
 from enum import Enum
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from stat import S_ISREG
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 from uuid import uuid4
 
 from pydantic import (
@@ -20,24 +38,38 @@ from typing_extensions import Self
 
 from auto_unpack.plugin import HandlePluginConfig, Plugin
 from auto_unpack.store import Context, FileData
+from auto_unpack.util.concurrency import AdaptiveLimiter, SpaceBudget, ThreadBudget
+from auto_unpack.util.exec import CancelToken
 from auto_unpack.util.file import (
+    DirIndex,
+    PathReserver,
+    file_fingerprint,
+    file_hash,
     get_next_not_exist_path,
-    is_path_in_includes,
+    get_part_dir,
+    is_same_device,
+    move_dir_into,
     path_equal,
     read_file_lines,
     write_file,
 )
+from auto_unpack.util.journal import Journal, Journal_Sync
+from auto_unpack.util.ledger import ArchiveLedger, LedgerRecord
+from auto_unpack.util.password import PasswordCache, PasswordRanker
 from auto_unpack.util.sevenzip import (
-    ExtractResult,
     ListResult,
     Result,
     ResultCode,
     SevenZipUtil,
 )
-from auto_unpack.util.sevenzip.result import Attr
+from auto_unpack.util.sevenzip.builtin import BuiltinSevenZipUtil
+from auto_unpack.util.sevenzip.result import Attr, FileEntry, get_volume_family
 
 logger = logging.getLogger(__name__)
 
+# 启用 CPU 预算时, 解压后每多少字节分配一个 7-zip 线程
+CPU_THREAD_BYTES = 128 * 1024 * 1024
+
 
 class ArchiveInfoStatus(Enum):
     """
@@ -122,11 +154,19 @@ class ArchiveFile(BaseModel):
     info: Optional[ArchiveInfo] = None
     # 异常信息
     error: Optional[ArchiveError] = None
+    # 内容相同的首个压缩包(重复的压缩包不再处理, 使用其处理结果)
+    duplicate_of: Optional[Path] = None
 
     # 上下文数据(暂存)
     file_data: FileData = Field(exclude=True)
     # 识别结果(暂存)
     info_result: Optional[ListResult] = Field(None, exclude=True)
+    # 文件头是否加密(暂存, 识别时其他密码失败, 识别所用密码即为正确密码)
+    header_encrypted: bool = Field(False, exclude=True)
+    # 文件指纹(暂存)
+    fingerprint: Optional[str] = Field(None, exclude=True)
+    # 绝对路径(暂存, 用于分卷去重)
+    resolved_path: str = Field("", exclude=True)
 
 
 class ArchiveStatGroup(BaseModel):
@@ -155,6 +195,10 @@ class ArchiveStat(BaseModel):
 
     # 文件数
     count: int = 0
+    # 已处理过(跳过)的文件数
+    skipped: Optional[int] = None
+    # 内容重复的文件数
+    duplicate: Optional[int] = None
 
     # 各种状态数量
     list_success: Optional[int] = None
@@ -185,21 +229,102 @@ class ArchivePluginConfig(HandlePluginConfig):
         default_factory=lambda: Path("passwords.txt"),
         description="密码表文件路径(默认: passwords.txt)",
     )
+    password_cache_path: Optional[Path] = Field(
+        default=None,
+        description="密码缓存文件路径, 按压缩包指纹记录可用密码(null: 不使用缓存, 默认: null)",
+    )
+    password_order: Literal["file", "hit"] = Field(
+        default="file",
+        description="密码尝试顺序(默认: file)\nfile: 按密码表顺序\nhit: 按历史命中次数从高到低",
+    )
+    password_hit_path: Path = Field(
+        default_factory=lambda: Path(".cache/password-hit.json"),
+        description="密码命中记录文件路径(默认: .cache/password-hit.json)",
+    )
+    password_hit_scope: Literal["global", "dir", "name"] = Field(
+        default="global",
+        description="密码命中分组, 同组命中次数优先(默认: global)\nglobal: 不分组\ndir: 按压缩包所在目录\nname: 按压缩包文件名规则(数字视为通配)",
+    )
     fail_key: Optional[str] = Field(
         default=None, description="失败上下文 key(默认: null)"
     )
     stat_file_name: Optional[str] = Field(
         default=None, description="统计信息文件名，不同模式对应不同统计信息(默认: null)"
     )
+    dedup: bool = Field(
+        default=False,
+        description="是否跳过内容相同的压缩包, 以分卷族为单位先按各文件大小分组, 大小相同时再比较各文件内容哈希, 重复的压缩包不再处理, 直接使用首个压缩包的处理结果(默认: false)",
+    )
+    ledger_path: Optional[Path] = Field(
+        default=None,
+        description="已处理压缩包记录文件路径(SQLite), 记录各模式下处理成功的压缩包, 再次执行时跳过路径, 大小及修改时间均未变化的压缩包(null: 不记录, 默认: null)",
+    )
+    journal_path: Optional[Path] = Field(
+        default=None,
+        description="预写日志文件路径, 记录各压缩包的处理结果及暂存目录, 进程异常退出后再次执行时清理残留的暂存目录, 并恢复已完成的压缩包(null: 不记录, 默认: null)",
+    )
+    journal_sync: Journal_Sync = Field(
+        default="batch",
+        description="预写日志同步策略(默认: batch)\nalways: 每条记录立即同步到磁盘\nbatch: 每条记录刷新到系统缓冲区, 每秒最多同步一次到磁盘\nnever: 仅刷新到系统缓冲区, 进程被结束不丢失, 系统崩溃/断电可能丢失",
+    )
+    ledger_fingerprint: bool = Field(
+        default=False,
+        description="已处理压缩包记录是否同时比较文件指纹(首尾数据块哈希), 可识别大小及修改时间均未变化的内容修改(默认: false)",
+    )
+    password_probe: bool = Field(
+        default=False,
+        description="是否启用密码探测, 测试/解压前仅用最小的加密文件筛选密码(默认: false)",
+    )
     thread_max: int = Field(
         default=10,
         description="线程池最大线程数(默认: 10)",
         json_schema_extra={"minimum": 1},
     )
+    password_thread_max: int = Field(
+        default=1,
+        description="单个压缩包并发尝试密码的最大进程数(默认: 1, 即逐个尝试)",
+        json_schema_extra={"minimum": 1},
+    )
+    concurrency: Literal["fixed", "auto"] = Field(
+        default="fixed",
+        description="并发控制模式(默认: fixed)\nfixed: 各阶段按最大线程数并发\nauto: 根据吞吐量, CPU 负载及磁盘队列深度在 1 与最大线程数之间自动调整各阶段并发数",
+    )
+    cpu_budget: Optional[int] = Field(
+        default=None,
+        description="测试/解压时所有 7-zip 进程共用的线程总数, 按解压后大小为每个压缩包分配线程数(-mmt), 大压缩包多分配, 小压缩包分配 1 个(null: 不限制, 由 7-zip 自行决定, 默认: null)",
+        json_schema_extra={"minimum": 1},
+    )
+    list_thread_max: Optional[int] = Field(
+        default=None,
+        description="识别阶段最大线程数(null: 同 thread_max, 默认: null)",
+        json_schema_extra={"minimum": 1},
+    )
+    test_thread_max: Optional[int] = Field(
+        default=None,
+        description="测试阶段最大线程数(null: 同 thread_max, 默认: null)",
+        json_schema_extra={"minimum": 1},
+    )
+    extract_thread_max: Optional[int] = Field(
+        default=None,
+        description="解压阶段最大线程数(null: 同 thread_max, 默认: null)",
+        json_schema_extra={"minimum": 1},
+    )
+    pipeline: bool = Field(
+        default=False,
+        description="是否启用流水线模式, 同一目录下的压缩包识别完成后立即测试/解压, 无需等待全部压缩包识别完成(默认: false)",
+    )
+    schedule: Literal["fifo", "largest_first", "smallest_first"] = Field(
+        default="fifo",
+        description="测试/解压顺序(默认: fifo)\nfifo: 按扫描顺序\nlargest_first: 按解压后大小从大到小, 避免大压缩包最后处理拖长总耗时\nsmallest_first: 按解压后大小从小到大, 尽快完成更多压缩包",
+    )
     result_processing_mode: Result_Processing_Mode = Field(
         default="strict",
         description="结果处理模式(默认: strict)\nstrict: 严格模式[结果绝对依靠 7-zip 命令行输出]\ngreedy: 贪婪模式[7-zip 返回某些错误码时, 也会尝试识别/测试/解压]",
     )
+    backend: Literal["7zip", "builtin"] = Field(
+        default="7zip",
+        description="压缩包处理后端(默认: 7zip)\n7zip: 7-zip 命令行\nbuiltin: zip/tar 使用 Python 内置库在进程内处理, 其他格式回退至 7-zip 命令行",
+    )
     # mode: extract 可用选项
     output_dir: Path = Field(
         default_factory=lambda: Path("output"),
@@ -208,6 +333,15 @@ class ArchivePluginConfig(HandlePluginConfig):
     keep_dir: bool = Field(
         default=True, description="是否保持解压后的文件夹结构(默认: true)"
     )
+    staging_dir: Optional[Path] = Field(
+        default=None,
+        description="解压暂存目录, 应与 output_dir 位于同一文件系统, 解压完成后只需重命名即可移动到 output_dir(null: .cache 与 output_dir 位于同一文件系统时使用 .cache, 否则使用 output_dir 下的 .staging 目录, 默认: null)",
+    )
+    staging_space_max: Optional[int] = Field(
+        default=None,
+        description="解压暂存目录最大占用空间(单位: 字节), 每次尝试密码解压按解压后大小预估占用, 超出时暂停新的解压, 直到已解压的压缩包移动到 output_dir(null: 不限制, 默认: null)",
+        json_schema_extra={"minimum": 1},
+    )
 
     @model_validator(mode="after")
     def validator(self) -> Self:
@@ -216,16 +350,34 @@ class ArchivePluginConfig(HandlePluginConfig):
             raise ValueError(f"Password file `{password_path}` does not exist")
         return self
 
-    @field_validator("thread_max")
+    @field_validator(
+        "thread_max",
+        "password_thread_max",
+        "list_thread_max",
+        "test_thread_max",
+        "extract_thread_max",
+        "cpu_budget",
+    )
     @classmethod
-    def validate_thread_max(cls, v: int):
-        if v <= 0:
+    def validate_thread_max(cls, v: Optional[int]):
+        if v is not None and v <= 0:
             raise ValueError(f"Thread max should be greater than 0, but got `{v}`")
         return v
 
+    @field_validator("staging_space_max")
+    @classmethod
+    def validate_staging_space_max(cls, v: Optional[int]):
+        if v is not None and v <= 0:
+            raise ValueError(
+                f"Staging space max should be greater than 0, but got `{v}`"
+            )
+        return v
+
 
 Result_Level = Literal["success", "warning", "error"]
 
+Archive_Stage = Literal["list", "test", "extract"]
+
 
 class ArchivePlugin(Plugin[ArchivePluginConfig]):
     """
@@ -236,12 +388,47 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
 
     name: str = "archive"
     passwords: List[str] = []
+    password_cache: Optional[PasswordCache] = None
+    password_ranker: Optional[PasswordRanker] = None
+    # 已处理压缩包记录(未启用时为 None)
+    ledger: Optional[ArchiveLedger] = None
+    # 预写日志(未启用时为 None)
+    journal: Optional[Journal] = None
+    # 预写日志中已完成的压缩包记录(绝对路径 -> 记录)
+    journal_archives: Dict[str, Dict[str, Any]] = {}
+    # 压缩包处理工具
+    sevenzip: Type[SevenZipUtil] = SevenZipUtil
 
     archive_files: List[ArchiveFile] = []
+    # 压缩包分组(同一文件夹下同一分卷族)
+    archive_groups: List[List[ArchiveFile]] = []
+    # 已处理过而跳过的压缩包数
+    skipped_count: int = 0
+    # 内容重复的压缩包(重复的压缩包, 首个压缩包)
+    duplicate_files: List[Tuple[ArchiveFile, ArchiveFile]] = []
+
+    # 各阶段并发限制器(每次执行重新创建)
+    limiters: Dict[str, AdaptiveLimiter] = {}
+    # 7-zip 线程预算(未启用 CPU 预算时为 None)
+    thread_budget: Optional[ThreadBudget] = None
+
+    # 目录文件索引(查找分卷文件使用, 每次执行重新创建)
+    dir_index: DirIndex = DirIndex()
 
     cache_dir: Path = Path(".cache")
     cache_dirs: List[Path] = []
-    file_lock = threading.Lock()
+    # 解压暂存目录(解压前确定)
+    staging_dir: Path = cache_dir
+    # 暂存目录是否由本次执行创建(结束时删除)
+    staging_created: bool = False
+    # 暂存空间预算(未限制暂存空间时为 None)
+    staging_budget: Optional[SpaceBudget] = None
+    # 输出目录名预留(每次执行重新创建)
+    path_reserver: PathReserver = PathReserver()
+
+    def init(self):
+        if self.config.backend == "builtin":
+            self.sevenzip = BuiltinSevenZipUtil
 
     def _load_passwords(self):
         """
@@ -257,14 +444,502 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
                 start_index = i + 1
                 break
 
-        # 添加空密码到第一位
-        passwords = [p for p in lines[start_index:] if len(p) > 0]
+        # 去除重复密码(保持原顺序), 添加空密码到第一位
+        passwords = list(dict.fromkeys(p for p in lines[start_index:] if len(p) > 0))
         self.passwords = [""] + passwords
 
         logger.info(
             f"Loaded {len(passwords)} passwords from `{self.config.password_path}`"
         )
 
+        # 加载密码缓存
+        self.password_cache = None
+        if self.config.password_cache_path is not None:
+            self.password_cache = PasswordCache(self.config.password_cache_path)
+
+        # 加载密码命中记录
+        self.password_ranker = None
+        if self.config.password_order == "hit":
+            self.password_ranker = PasswordRanker(self.config.password_hit_path)
+
+    def _get_fingerprint(self, archive_file: ArchiveFile) -> Optional[str]:
+        """
+        获取压缩包指纹
+
+        :param archive_file: 压缩包
+        :return: 指纹, 获取失败时返回 None
+        """
+        if archive_file.fingerprint is None:
+            try:
+                archive_file.fingerprint = file_fingerprint(archive_file.path)
+            except OSError as e:
+                logger.warning(f"Fingerprint archive `{archive_file.path}` failed: {e}")
+        return archive_file.fingerprint
+
+    def _get_password_scope(self, archive_file: ArchiveFile) -> Optional[str]:
+        """
+        获取压缩包的密码命中分组
+
+        :param archive_file: 压缩包
+        :return: 分组, 不分组时返回 None
+        """
+        if self.config.password_hit_scope == "dir":
+            return str(archive_file.path.parent.resolve())
+        elif self.config.password_hit_scope == "name":
+            # data_2024.part1.rar => data_*.part*.rar
+            return re.sub(r"\d+", "*", archive_file.path.name)
+        return None
+
+    def _get_passwords(self, archive_file: ArchiveFile) -> List[str]:
+        """
+        获取压缩包的密码尝试顺序
+
+        1. 始终首先尝试空密码(未加密的压缩包使用任意密码均可处理成功)
+        2. 存在缓存密码时其次尝试缓存密码
+        3. 启用命中排序时其余密码按历史命中次数排序
+
+        :param archive_file: 压缩包
+        :return: 密码列表
+        """
+        passwords = self.passwords[1:]
+        if self.password_ranker is not None:
+            scope = self._get_password_scope(archive_file)
+            passwords = self.password_ranker.rank(passwords, scope)
+
+        cache_password = None
+        if self.password_cache is not None:
+            fingerprint = self._get_fingerprint(archive_file)
+            if fingerprint is not None:
+                cache_password = self.password_cache.get(fingerprint)
+
+        if cache_password:
+            logger.debug(f"Password cache hit for archive `{archive_file.path}`")
+            passwords = [cache_password] + [p for p in passwords if p != cache_password]
+        return [""] + passwords
+
+    def _iter_success_passwords(self) -> Iterator[Tuple[ArchiveFile, str]]:
+        """
+        遍历处理成功的压缩包及其所需密码
+
+        空密码总是首先尝试, 使用其他密码成功说明空密码失败, 即压缩包需要该密码;
+        空密码即可处理的压缩包不记录
+
+        :return: (压缩包, 密码)
+        """
+        for archive_file in self.archive_files:
+            if archive_file.info is None or archive_file.status not in [
+                ArchiveInfoStatus.LIST_SUCCESS,
+                ArchiveInfoStatus.TEST_SUCCESS,
+                ArchiveInfoStatus.EXTRACT_SUCCESS,
+            ]:
+                continue
+            password = archive_file.info.password
+            if not password:
+                continue
+            yield archive_file, password
+
+    def _save_passwords(self):
+        """
+        保存密码缓存及密码命中记录
+        """
+        if self.password_cache is None and self.password_ranker is None:
+            return
+
+        for archive_file, password in self._iter_success_passwords():
+            if self.password_cache is not None:
+                fingerprint = self._get_fingerprint(archive_file)
+                if fingerprint is not None:
+                    self.password_cache.put(fingerprint, password)
+            if self.password_ranker is not None:
+                scope = self._get_password_scope(archive_file)
+                self.password_ranker.hit(password, scope)
+
+        if self.password_cache is not None:
+            self.password_cache.save()
+        if self.password_ranker is not None:
+            self.password_ranker.save()
+
+    def _load_ledger(self):
+        """
+        加载已处理压缩包记录
+        """
+        self.ledger = None
+        if self.config.ledger_path is None:
+            return
+        self.ledger = ArchiveLedger(self.config.ledger_path, self.config.mode)
+
+    def _get_ledger_record(self, archive_file: ArchiveFile) -> Optional[LedgerRecord]:
+        """
+        获取压缩包当前的记录值
+
+        :param archive_file: 压缩包
+        :return: 记录, 获取失败时返回 None
+        """
+        try:
+            stat = archive_file.path.stat()
+        except OSError as e:
+            logger.warning(f"Stat archive `{archive_file.path}` failed: {e}")
+            return None
+
+        fingerprint = None
+        if self.config.ledger_fingerprint:
+            fingerprint = self._get_fingerprint(archive_file)
+            if fingerprint is None:
+                return None
+        return LedgerRecord(stat.st_size, stat.st_mtime_ns, fingerprint)
+
+    def _is_processed(self, archive_file: ArchiveFile) -> bool:
+        """
+        判断压缩包是否已处理过且未变化
+
+        :param archive_file: 压缩包
+        :return: 是否已处理过
+        """
+        record = self.ledger.get(archive_file.resolved_path)
+        if record is None:
+            return False
+        return record == self._get_ledger_record(archive_file)
+
+    def _skip_processed_groups(
+        self, groups: List[List[ArchiveFile]]
+    ) -> List[List[ArchiveFile]]:
+        """
+        跳过已处理过的压缩包分组(组内所有文件均已处理过且未变化)
+
+        分卷压缩包的各分卷在同一组内, 新增/修改任一分卷时整组重新处理
+
+        :param groups: 压缩包分组
+        :return: 待处理的压缩包分组
+        """
+        self.skipped_count = 0
+        if self.ledger is None:
+            return groups
+
+        pending_groups: List[List[ArchiveFile]] = []
+        skipped_ids: Set[int] = set()
+        for group in groups:
+            if all(self._is_processed(f) for f in group):
+                skipped_ids.update(id(f) for f in group)
+                continue
+            pending_groups.append(group)
+
+        if len(skipped_ids) > 0:
+            self.skipped_count = len(skipped_ids)
+            self.archive_files = [
+                f for f in self.archive_files if id(f) not in skipped_ids
+            ]
+            logger.info(f"Skipped {self.skipped_count} already processed archives")
+        return pending_groups
+
+    def _save_ledger(self):
+        """
+        记录处理成功的压缩包分组(组内无失败的文件)
+        """
+        if self.ledger is None:
+            return
+
+        success_status = {
+            "list": ArchiveInfoStatus.LIST_SUCCESS,
+            "test": ArchiveInfoStatus.TEST_SUCCESS,
+            "extract": ArchiveInfoStatus.EXTRACT_SUCCESS,
+        }[self.config.mode]
+
+        for group in self.archive_groups:
+            if not all(
+                f.status in (success_status, ArchiveInfoStatus.LIST_VOLUME)
+                for f in group
+            ):
+                continue
+            if not any(f.status == success_status for f in group):
+                continue
+            for archive_file in group:
+                record = self._get_ledger_record(archive_file)
+                if record is not None:
+                    self.ledger.put(archive_file.resolved_path, record)
+
+        self.ledger.save()
+
+    def _get_final_status(self) -> Set[ArchiveInfoStatus]:
+        """
+        获取当前处理模式下的最终状态(达到后不再处理)
+
+        :return: 状态集合
+        """
+        final_status = {ArchiveInfoStatus.LIST_FAIL, ArchiveInfoStatus.LIST_VOLUME}
+        if self.config.mode == "list":
+            final_status.add(ArchiveInfoStatus.LIST_SUCCESS)
+        elif self.config.mode == "test":
+            final_status.update(
+                {ArchiveInfoStatus.TEST_SUCCESS, ArchiveInfoStatus.TEST_FAIL}
+            )
+        else:
+            final_status.update(
+                {ArchiveInfoStatus.EXTRACT_SUCCESS, ArchiveInfoStatus.EXTRACT_FAIL}
+            )
+        return final_status
+
+    def _open_journal(self):
+        """
+        打开预写日志, 清理上次异常退出残留的暂存目录及未完成的输出目录,
+        并加载已完成的压缩包记录
+        """
+        self.journal = None
+        self.journal_archives = {}
+        if self.config.journal_path is None:
+            return
+
+        self.journal = Journal(self.config.journal_path, self.config.journal_sync)
+        header = {"mode": self.config.mode}
+        if self.config.mode == "extract":
+            header["output_dir"] = str(self.config.output_dir.absolute())
+        records = self.journal.open(header)
+        if len(records) == 0:
+            return
+
+        staging_count = 0
+        outputs: Set[Path] = set()
+        for record in records:
+            if "staging" in record:
+                staging_dir = Path(record["staging"])
+                if staging_dir.exists():
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    staging_count += 1
+            elif "archive" in record:
+                self.journal_archives[record["archive"]] = record
+            elif "output" in record:
+                outputs.add(Path(record["output"]))
+
+        # 已预留但压缩包未记录完成的输出目录(空目录或移动到一半),
+        # 删除后重新解压时可使用同名目录
+        for record in self.journal_archives.values():
+            if record["output"] is not None:
+                outputs.discard(Path(record["output"]).absolute())
+        output_count = 0
+        for output in outputs:
+            for output_dir in [output, get_part_dir(output)]:
+                if output_dir.exists():
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                    output_count += 1
+
+        logger.info(
+            f"Resuming from journal `{self.config.journal_path}`: "
+            f"{len(self.journal_archives)} finished archives, "
+            f"{staging_count} stale staging dirs removed, "
+            f"{output_count} unfinished output dirs removed"
+        )
+
+    def _journal_archives(self, archive_files: List[ArchiveFile]):
+        """
+        记录达到最终状态的压缩包
+
+        :param archive_files: 压缩包列表
+        """
+        if self.journal is None:
+            return
+
+        final_status = self._get_final_status()
+        for archive_file in archive_files:
+            if archive_file.status not in final_status:
+                continue
+            record = self._get_ledger_record(archive_file)
+            if record is None:
+                continue
+
+            info = None
+            if archive_file.info is not None:
+                info = archive_file.info.model_dump(mode="json")
+                info["main_path"] = str(archive_file.info.main_path)
+            error = None
+            if archive_file.error is not None:
+                error = {"message": archive_file.error.message}
+                if archive_file.error.code is not None:
+                    error["code"] = archive_file.error.code.name
+
+            self.journal.append(
+                {
+                    "archive": archive_file.resolved_path,
+                    "size": record.size,
+                    "mtime_ns": record.mtime_ns,
+                    "status": archive_file.status.name,
+                    "output": (
+                        None
+                        if archive_file.output is None
+                        else str(archive_file.output)
+                    ),
+                    "info": info,
+                    "error": error,
+                }
+            )
+
+    def _restore_journal_archive(self, archive_file: ArchiveFile) -> bool:
+        """
+        从预写日志恢复压缩包状态(文件未变化时)
+
+        :param archive_file: 压缩包
+        :return: 是否恢复成功
+        """
+        record = self.journal_archives.get(archive_file.resolved_path, None)
+        if record is None:
+            return False
+        current = self._get_ledger_record(archive_file)
+        if current is None or (current.size, current.mtime_ns) != (
+            record["size"],
+            record["mtime_ns"],
+        ):
+            return False
+
+        archive_file.status = ArchiveInfoStatus[record["status"]]
+        if record["output"] is not None:
+            archive_file.output = Path(record["output"])
+        if record["info"] is not None:
+            archive_file.info = ArchiveInfo.model_validate(record["info"])
+        error = record["error"]
+        if error is not None:
+            code = error.get("code", None)
+            archive_file.error = ArchiveError(
+                message=error["message"],
+                code=None if code is None else ResultCode[code],
+            )
+        return True
+
+    def _restore_journal_groups(
+        self, groups: List[List[ArchiveFile]]
+    ) -> List[List[ArchiveFile]]:
+        """
+        从预写日志恢复已完成的压缩包分组(组内所有文件均已达到最终状态且未变化)
+
+        :param groups: 压缩包分组
+        :return: 待处理的压缩包分组
+        """
+        if len(self.journal_archives) == 0:
+            return groups
+
+        pending_groups: List[List[ArchiveFile]] = []
+        restored_count = 0
+        for group in groups:
+            if not all(f.resolved_path in self.journal_archives for f in group):
+                pending_groups.append(group)
+                continue
+            if not all(self._restore_journal_archive(f) for f in group):
+                # 部分文件已变化, 整组重新处理
+                for archive_file in group:
+                    archive_file.status = ArchiveInfoStatus.INIT
+                    archive_file.output = None
+                    archive_file.info = None
+                    archive_file.error = None
+                pending_groups.append(group)
+                continue
+            restored_count += len(group)
+
+        if restored_count > 0:
+            logger.info(f"Restored {restored_count} archives from journal")
+        return pending_groups
+
+    def _close_journal(self, completed: bool):
+        """
+        关闭预写日志
+
+        :param completed: 是否全部处理完成(完成时删除日志)
+        """
+        if self.journal is None:
+            return
+        self.journal.close(remove=completed)
+        self.journal = None
+
+    def _get_content_hash(self, archive_file: ArchiveFile) -> Optional[str]:
+        """
+        获取压缩包内容哈希
+
+        :param archive_file: 压缩包
+        :return: 哈希值, 读取失败时返回 None
+        """
+        try:
+            return file_hash(archive_file.path)
+        except OSError as e:
+            logger.warning(f"Hash archive `{archive_file.path}` failed: {e}")
+            return None
+
+    def _dedup_groups(self, groups: List[List[ArchiveFile]]) -> List[List[ArchiveFile]]:
+        """
+        移除内容重复的压缩包分组
+
+        以分组(同一文件夹下的分卷族)为单位比较, 组内文件按文件名排序后逐个对应;
+        先按各文件大小分组, 仅对大小均相同的分组计算各文件内容哈希,
+        各文件大小及哈希均相同时, 保留首个分组, 其余分组不再处理
+        (分卷压缩包只有部分分卷相同时不视为重复)
+
+        :param groups: 压缩包分组
+        :return: 待处理的压缩包分组
+        """
+        self.duplicate_files = []
+        if not self.config.dedup:
+            return groups
+
+        size_map: Dict[Tuple[int, ...], List[List[ArchiveFile]]] = defaultdict(list)
+        for group in groups:
+            members = sorted(group, key=lambda f: f.path.name.lower())
+            sizes = []
+            for archive_file in members:
+                try:
+                    stat = archive_file.path.stat()
+                except OSError:
+                    break
+                if not S_ISREG(stat.st_mode):
+                    break
+                sizes.append(stat.st_size)
+            else:
+                size_map[tuple(sizes)].append(members)
+
+        candidates = [
+            members
+            for same_size_groups in size_map.values()
+            if len(same_size_groups) > 1
+            for members in same_size_groups
+        ]
+        if len(candidates) == 0:
+            return groups
+
+        candidate_files = [f for members in candidates for f in members]
+        pool = ThreadPool(self._get_thread_max("list"))
+        hashes = pool.map(self._get_content_hash, candidate_files)
+        pool.close()
+        pool.join()
+        file_hashes = {id(f): h for f, h in zip(candidate_files, hashes)}
+
+        originals: Dict[Tuple[Optional[str], ...], List[ArchiveFile]] = {}
+        duplicate_ids: Set[int] = set()
+        for members in candidates:
+            content_hashes = tuple(file_hashes[id(f)] for f in members)
+            if None in content_hashes:
+                continue
+            original = originals.setdefault(content_hashes, members)
+            if original is members:
+                continue
+            for archive_file, original_file in zip(members, original):
+                self.duplicate_files.append((archive_file, original_file))
+                duplicate_ids.add(id(archive_file))
+
+        if len(duplicate_ids) == 0:
+            return groups
+
+        logger.info(f"Found {len(duplicate_ids)} duplicate archives")
+        return [group for group in groups if id(group[0]) not in duplicate_ids]
+
+    def _resolve_duplicates(self):
+        """
+        重复的压缩包使用首个压缩包的处理结果
+        """
+        for archive_file, original in self.duplicate_files:
+            archive_file.status = original.status
+            archive_file.output = original.output
+            archive_file.error = original.error
+            if original.info is not None:
+                archive_file.info = original.info.model_copy()
+            archive_file.duplicate_of = original.path
+            logger.debug(
+                f"Archive `{archive_file.path}` is a duplicate of `{original.path}`"
+            )
+
     def _get_result_level(self, result: Result) -> Result_Level:
         """
         获取返回结果的级别
@@ -295,14 +970,134 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
 
         return "success" if result.code == ResultCode.NO_ERROR else "error"
 
+    def _get_probe_entry(self, archive_file: ArchiveFile) -> Optional[FileEntry]:
+        """
+        获取用于密码探测的文件(最小的加密文件)
+
+        流式读取文件列表, 不缓存完整的文件列表
+
+        :param archive_file: 压缩包
+        :return: 探测文件, 不存在加密文件时返回 None
+        """
+        info_result = archive_file.info_result
+        stream = self.sevenzip.iter_list(info_result.file_path, info_result.password)
+        entries = (f for f in stream if not f.is_dir and f.encrypted)
+        return min(
+            entries,
+            key=lambda f: f.size if f.size is not None else float("inf"),
+            default=None,
+        )
+
+    def _probe_password(self, archive_file: ArchiveFile) -> Optional[str]:
+        """
+        密码探测
+
+        仅测试压缩包内最小的加密文件来筛选密码, 避免每次尝试都完整解压整个压缩包
+
+        :param archive_file: 压缩包
+        :return: 探测到的密码, 探测失败时返回 None
+        """
+        entry = self._get_probe_entry(archive_file)
+        if entry is None:
+            return None
+
+        logger.debug(f"Probing password of `{archive_file.path}` with `{entry.path}`")
+
+        info_result = archive_file.info_result
+        passwords = [info_result.password] + [
+            p for p in self._get_passwords(archive_file) if p != info_result.password
+        ]
+
+        def probe(password: str, cancel_token: Optional[CancelToken]) -> Result:
+            return self.sevenzip.test(
+                info_result.file_path,
+                password,
+                includes=[entry.path],
+                cancel_token=cancel_token,
+            )
+
+        password, _, _ = self._try_passwords(passwords, probe)
+        return password
+
+    def _try_passwords(
+        self,
+        passwords: List[str],
+        attempt: Callable[[str, Optional[CancelToken]], Result],
+    ) -> Tuple[Optional[str], Result, Result_Level]:
+        """
+        尝试密码, 直到成功为止
+
+        首个密码单独尝试, 其余密码按 password_thread_max 并发尝试,
+        任一密码成功后结束其余正在执行的尝试
+
+        :param passwords: 密码列表(不可为空)
+        :param attempt: 尝试函数 (password, cancel_token) -> Result
+        :return: (成功的密码(全部失败时为 None), 结果, 结果级别)
+        """
+        result = attempt(passwords[0], None)
+        level = self._get_result_level(result)
+        if level != "error":
+            return passwords[0], result, level
+
+        others = passwords[1:]
+        if self.config.password_thread_max <= 1 or len(others) <= 1:
+            for password in others:
+                result = attempt(password, None)
+                level = self._get_result_level(result)
+                if level != "error":
+                    return password, result, level
+            return None, result, "error"
+
+        cancel_token = CancelToken()
+        lock = threading.Lock()
+        # 成功结果, 最后一次失败结果
+        success: List[Tuple[str, Result, Result_Level]] = []
+        fails: List[Result] = [result]
+
+        def attempt_item(password: str):
+            if cancel_token.cancelled:
+                return
+            item_result = attempt(password, cancel_token)
+            item_level = self._get_result_level(item_result)
+            with lock:
+                if item_level == "error" or cancel_token.cancelled:
+                    fails.append(item_result)
+                    return
+                success.append((password, item_result, item_level))
+            cancel_token.cancel()
+
+        pool = ThreadPool(min(self.config.password_thread_max, len(others)))
+        pool.map(attempt_item, others)
+        pool.close()
+        pool.join()
+
+        if len(success) > 0:
+            return success[0]
+        return None, fails[-1], "error"
+
+    def _get_first_password(self, archive_file: ArchiveFile) -> str:
+        """
+        获取测试/解压时首先尝试的密码
+
+        :param archive_file: 压缩包
+        :return: 密码
+        """
+        password = archive_file.info_result.password
+        # 文件头已加密时识别所用密码已验证正确, 无需探测
+        if self.config.password_probe and not archive_file.header_encrypted:
+            probe_password = self._probe_password(archive_file)
+            if probe_password is not None:
+                password = probe_password
+        return password
+
     def _list_archives_item(self, archive_files: List[ArchiveFile]):
         """
         识别压缩包
 
         :param archive_files: 待识别压缩包列表
         """
-        # 识别成功的压缩包
-        success_archive_files: List[ArchiveFile] = []
+        # 已识别成功的压缩包的分卷(绝对路径)
+        included_paths: Set[str] = set()
 
         for archive_file in archive_files:
             # 跳过文件夹
@@ -315,58 +1110,214 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
                 continue
 
             # 跳过已被识别的分卷
-            is_included = any(
-                (
-                    c
-                    for c in success_archive_files
-                    if is_path_in_includes(archive_file.path, c.info.volumes)
-                )
-            )
-            if is_included:
+            if archive_file.resolved_path in included_paths:
                 continue
 
             if self.config.mode == "list":
                 logger.info(f"Listing archive `{archive_file.path}`")
 
-            for password in self.passwords:
-                list_result = SevenZipUtil.list(archive_file.path, password)
-
-                level = self._get_result_level(list_result)
-                if level == "error":
-                    continue
-
-                archive_file.status = ArchiveInfoStatus.LIST_SUCCESS
-                archive_file.info_result = list_result
-                archive_file.info = ArchiveInfo(
-                    attr=list_result.attr,
-                    is_volume=list_result.is_volume,
-                    volumes=list_result.volume_paths,
-                    password=password if password != "" else None,
-                    main_path=list_result.volume_main_path,
+            def list_archive(
+                password: str, cancel_token: Optional[CancelToken]
+            ) -> Result:
+                return self.sevenzip.list(
+                    archive_file.path, password, cancel_token=cancel_token
                 )
-                if level == "warning":
-                    archive_file.error = ArchiveError(
-                        message=list_result.message,
-                        code=list_result.code,
-                    )
-                success_archive_files.append(archive_file)
-                break
-            else:
+
+            password, list_result, level = self._try_passwords(
+                self._get_passwords(archive_file), list_archive
+            )
+
+            if password is None:
                 archive_file.status = ArchiveInfoStatus.LIST_FAIL
                 archive_file.error = ArchiveError(
                     message=list_result.message,
                     code=list_result.code,
                 )
+                continue
 
-    def _list_archives(self):
+            archive_file.status = ArchiveInfoStatus.LIST_SUCCESS
+            archive_file.info_result = list_result
+            # 文件头未加密时空密码即可识别, 空密码识别失败说明文件头已加密
+            archive_file.header_encrypted = password != ""
+            archive_file.info = ArchiveInfo(
+                attr=list_result.attr,
+                is_volume=list_result.is_volume,
+                volumes=list_result.find_volume_paths(self.dir_index),
+                password=password if password != "" else None,
+                main_path=list_result.volume_main_path,
+            )
+            if level == "warning":
+                archive_file.error = ArchiveError(
+                    message=list_result.message,
+                    code=list_result.code,
+                )
+            included_paths.update(str(p.resolve()) for p in archive_file.info.volumes)
+
+    def _get_thread_max(self, stage: Archive_Stage) -> int:
         """
-        识别压缩包
+        获取阶段最大线程数
+
+        :param stage: 阶段
+        :return: 最大线程数
+        """
+        thread_max = getattr(self.config, f"{stage}_thread_max")
+        return self.config.thread_max if thread_max is None else thread_max
+
+    def _init_limiters(self):
+        """
+        创建各阶段并发限制器, 7-zip 线程预算及暂存空间预算
+        """
+        adaptive = self.config.concurrency == "auto"
+        self.limiters = {
+            stage: AdaptiveLimiter(stage, self._get_thread_max(stage), adaptive)
+            for stage in ("list", "test", "extract")
+        }
+        self.thread_budget = None
+        if self.config.cpu_budget is not None:
+            self.thread_budget = ThreadBudget(self.config.cpu_budget)
+        self.staging_budget = None
+        if self.config.staging_space_max is not None:
+            self.staging_budget = SpaceBudget(self.config.staging_space_max)
+
+    def _get_unpacked_size(self, archive_file: ArchiveFile) -> int:
+        """
+        获取压缩包解压后大小(识别结果中的文件大小之和, 未知时使用压缩包大小)
+
+        :param archive_file: 压缩包
+        :return: 字节数
+        """
+        size = sum(f.size or 0 for f in archive_file.info_result.files)
+        if size == 0:
+            size = self._get_archive_size(archive_file)
+        return size
+
+    def _get_wanted_threads(self, archive_file: ArchiveFile) -> int:
+        """
+        按解压后大小计算压缩包期望的 7-zip 线程数
+
+        :param archive_file: 压缩包
+        :return: 线程数
+        """
+        threads = math.ceil(self._get_unpacked_size(archive_file) / CPU_THREAD_BYTES)
+        return max(1, min(self.config.cpu_budget, threads))
+
+    @contextmanager
+    def _take_threads(self, want: int) -> Iterator[Optional[int]]:
+        """
+        在线程预算内申请 7-zip 线程
+
+        :param want: 期望的线程数
+        :return: 分配到的线程数(未启用 CPU 预算时为 None)
+        """
+        if self.thread_budget is None:
+            yield None
+            return
+        with self.thread_budget.take(want) as threads:
+            yield threads
+
+    def _acquire_staging(
+        self, archive_file: ArchiveFile, cancel_token: Optional[CancelToken]
+    ) -> int:
+        """
+        按解压后大小预留暂存空间, 空间不足时等待
+
+        :param archive_file: 压缩包
+        :param cancel_token: 取消令牌(取消后不再等待)
+        :return: 预留的空间大小(未启用暂存空间预算或等待时被取消为 0)
+        """
+        if self.staging_budget is None:
+            return 0
+        size = self._get_unpacked_size(archive_file)
+        if not self.staging_budget.acquire(size, cancel_token):
+            return 0
+        return size
+
+    def _release_staging(self, size: int):
+        """
+        归还暂存空间
+
+        :param size: 预留的空间大小
+        """
+        if self.staging_budget is not None and size > 0:
+            self.staging_budget.release(size)
+
+    def _run_limited(
+        self, stage: Archive_Stage, work: float, func: Callable[..., Any], *args
+    ):
+        """
+        在阶段并发限制内执行
+
+        :param stage: 阶段
+        :param work: 工作量(识别: 压缩包数, 测试/解压: 字节数)
+        :param func: 执行函数
+        :param args: 函数参数
+        """
+        with self.limiters[stage].slot(work):
+            func(*args)
+
+    def _get_archive_size(self, archive_file: ArchiveFile) -> int:
+        """
+        获取压缩包大小(所有分卷大小之和)
+
+        :param archive_file: 压缩包
+        :return: 字节数
+        """
+        volumes = [archive_file.path]
+        if archive_file.info is not None:
+            volumes = archive_file.info.volumes
+        size = 0
+        for volume in volumes:
+            try:
+                size += os.stat(volume).st_size
+            except OSError:
+                pass
+        return size
+
+    def _get_schedule_key(self, archive_file: ArchiveFile) -> int:
+        """
+        获取压缩包调度排序键(越小越先处理)
+
+        :param archive_file: 压缩包
+        :return: 排序键
+        """
+        if self.config.schedule == "fifo":
+            return 0
+
+        size = self._get_unpacked_size(archive_file)
+        return -size if self.config.schedule == "largest_first" else size
+
+    def _get_scheduled_archive_files(self) -> List[ArchiveFile]:
+        """
+        获取识别成功的压缩包, 按调度策略排序
+
+        :return: 待测试/解压的压缩包
+        """
+        archive_files = [
+            archive_file
+            for archive_file in self.archive_files
+            if archive_file.status == ArchiveInfoStatus.LIST_SUCCESS
+        ]
+        if self.config.schedule == "fifo":
+            return archive_files
+        return sorted(archive_files, key=self._get_schedule_key)
+
+    def _load_archive_groups(self) -> List[List[ArchiveFile]]:
+        """
+        加载待识别压缩包, 并按所在文件夹及分卷族分组
+
+        同一分卷压缩包的各分卷必定位于同一文件夹且属于同一分卷族, 组内即可完成分卷去重,
+        文件夹内的大量压缩包可拆分为多组并发识别
+
+        :return: 压缩包分组
         """
         self.archive_files = []
+        self.dir_index = DirIndex()
         context = self.load_context()
 
-        # 线程分组 相同文件夹下的文件归为一组
+        # 线程分组 相同文件夹下相同分卷族的文件归为一组
         group = defaultdict(list)
+        # 文件夹绝对路径缓存
+        resolved_parents: Dict[Path, str] = {}
 
         # 上下文转化为压缩包文件 ArchiveFile
         for file_data in context.file_datas:
@@ -374,22 +1325,65 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
                 status=ArchiveInfoStatus.INIT,
                 path=file_data.path,
                 file_data=file_data,
+                resolved_path=str(file_data.path.resolve()),
             )
             self.archive_files.append(archive_file)
             parent = file_data.path.parent
-            group[str(parent.resolve())].append(archive_file)
+            if parent not in resolved_parents:
+                resolved_parents[parent] = str(parent.resolve())
+            family = get_volume_family(file_data.path.name)
+            group[(resolved_parents[parent], family)].append(archive_file)
 
-        # 多线程识别
-        pool = ThreadPool(self.config.thread_max)
+        groups = self._skip_processed_groups(list(group.values()))
+        self.archive_groups = groups
+        groups = self._dedup_groups(groups)
+        return self._restore_journal_groups(groups)
 
-        for _, archive_files in group.items():
-            pool.apply_async(self._list_archives_item, args=(archive_files,))
+    def _list_archives(self):
+        """
+        识别压缩包
+        """
+        groups = self._load_archive_groups()
+
+        # 多线程识别
+        pool = ThreadPool(self._get_thread_max("list"))
+
+        for archive_files in groups:
+            pool.apply_async(
+                self._run_limited,
+                args=(
+                    "list",
+                    len(archive_files),
+                    self._list_archives_item,
+                    archive_files,
+                ),
+            )
 
         pool.close()
         pool.join()
 
-        # 标记分卷子卷
-        for archive_file in self.archive_files:
+        # 标记分卷子卷(从预写日志恢复的压缩包无需标记)
+        self._mark_volumes([f for g in groups for f in g])
+
+        for archive_files in groups:
+            self._journal_archives(archive_files)
+
+    def _mark_volumes(self, archive_files: Optional[List[ArchiveFile]] = None):
+        """
+        标记分卷子卷
+
+        按绝对路径建立索引, 每个分卷只需一次查询
+
+        :param archive_files: 压缩包列表(null: 全部压缩包)
+        """
+        if archive_files is None:
+            archive_files = self.archive_files
+
+        path_index: Dict[str, List[ArchiveFile]] = defaultdict(list)
+        for archive_file in archive_files:
+            path_index[archive_file.resolved_path].append(archive_file)
+
+        for archive_file in archive_files:
             if archive_file.status != ArchiveInfoStatus.LIST_SUCCESS:
                 continue
 
@@ -400,19 +1394,18 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
             ):
                 continue
 
-            for archive_file_item in self.archive_files:
-                if archive_file_item == archive_file:
-                    continue
-                if not is_path_in_includes(
-                    archive_file_item.path, archive_file.info.volumes
-                ):
-                    continue
+            for volume in archive_file.info.volumes:
+                for archive_file_item in path_index.get(str(volume.resolve()), []):
+                    if archive_file_item is archive_file:
+                        continue
 
-                archive_file_item.status = ArchiveInfoStatus.LIST_VOLUME
-                # 拷贝参数
-                archive_file_item.info = archive_file.info.model_copy()
-                archive_file_item.info_result = archive_file.info_result.model_copy()
-                archive_file_item.error = None
+                    archive_file_item.status = ArchiveInfoStatus.LIST_VOLUME
+                    # 拷贝参数
+                    archive_file_item.info = archive_file.info.model_copy()
+                    archive_file_item.info_result = (
+                        archive_file.info_result.model_copy()
+                    )
+                    archive_file_item.error = None
 
     def _test_archives_item(self, archive_file: ArchiveFile):
         """
@@ -420,44 +1413,59 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
 
         :param archive_file: 待测试压缩包
         """
-        info_result = archive_file.info_result
-        if info_result is None:
+        if archive_file.info_result is None:
             return
 
+        self._test_archive(archive_file)
+        self._journal_archives([archive_file])
+
+    def _test_archive(self, archive_file: ArchiveFile):
+        """
+        使用各密码测试压缩包完整性
+
+        :param archive_file: 待测试压缩包
+        """
+        info_result = archive_file.info_result
+
         logger.info(f"Testing archive `{archive_file.path}`")
 
-        test_result = SevenZipUtil.test(info_result.file_path, info_result.password)
-        level = self._get_result_level(test_result)
+        first_password = self._get_first_password(archive_file)
+        passwords = [first_password] + [
+            p for p in self._get_passwords(archive_file) if p != first_password
+        ]
 
-        if level in ["success", "warning"]:
-            archive_file.status = ArchiveInfoStatus.TEST_SUCCESS
-            if level == "warning":
-                archive_file.error = ArchiveError(
-                    message=test_result.message,
-                    code=test_result.code,
+        want_threads = 1
+        if self.thread_budget is not None:
+            want_threads = self._get_wanted_threads(archive_file)
+
+        def test_archive(password: str, cancel_token: Optional[CancelToken]) -> Result:
+            with self._take_threads(want_threads) as threads:
+                return self.sevenzip.test(
+                    info_result.file_path,
+                    password,
+                    cancel_token=cancel_token,
+                    threads=threads,
                 )
-            return
 
-        for password in self.passwords:
-            test_result = SevenZipUtil.test(info_result.file_path, password)
-            level = self._get_result_level(test_result)
+        password, test_result, level = self._try_passwords(passwords, test_archive)
 
-            if level in ["success", "warning"]:
-                archive_file.status = ArchiveInfoStatus.TEST_SUCCESS
-                if level == "warning":
-                    archive_file.error = ArchiveError(
-                        message=test_result.message,
-                        code=test_result.code,
-                    )
-                # 更新密码
-                archive_file.info.password = password
-                break
-        else:
+        if password is None:
             archive_file.status = ArchiveInfoStatus.TEST_FAIL
             archive_file.error = ArchiveError(
                 message=test_result.message,
                 code=test_result.code,
             )
+            return
+
+        archive_file.status = ArchiveInfoStatus.TEST_SUCCESS
+        if level == "warning":
+            archive_file.error = ArchiveError(
+                message=test_result.message,
+                code=test_result.code,
+            )
+        if password != info_result.password:
+            # 更新密码
+            archive_file.info.password = password
 
     def _test_archives(self):
         """
@@ -466,25 +1474,61 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
         if self.config.mode != "test":
             return
 
-        pool = ThreadPool(self.config.thread_max)
-
-        for archive_file in self.archive_files:
-            if archive_file.status != ArchiveInfoStatus.LIST_SUCCESS:
-                continue
-            pool.apply_async(self._test_archives_item, args=(archive_file,))
+        pool = ThreadPool(self._get_thread_max("test"))
+
+        for archive_file in self._get_scheduled_archive_files():
+            pool.apply_async(
+                self._run_limited,
+                args=(
+                    "test",
+                    self._get_archive_size(archive_file),
+                    self._test_archives_item,
+                    archive_file,
+                ),
+            )
 
         pool.close()
         pool.join()
 
+    def _prepare_output_dir(self):
+        """
+        创建输出目录, 并确定解压暂存目录
+
+        暂存目录与输出目录位于同一文件系统时, 解压完成后移动到输出目录只需一次重命名,
+        否则每个解压出的文件都要再复制一次
+        """
+        output_dir = self.config.output_dir
+        if not output_dir.exists():
+            output_dir.mkdir(parents=True, exist_ok=True)
+        self.path_reserver = PathReserver()
+
+        staging_dir = self.config.staging_dir
+        if staging_dir is None:
+            staging_dir = self.cache_dir
+            if not is_same_device(staging_dir, output_dir):
+                staging_dir = output_dir / ".staging"
+        elif not is_same_device(staging_dir, output_dir):
+            logger.warning(
+                f"Staging dir `{staging_dir}` is not on the same filesystem as "
+                f"output dir `{output_dir}`, extracted files will be copied"
+            )
+
+        logger.debug(f"Staging extracted archives in `{staging_dir}`")
+        self.staging_dir = staging_dir
+        self.staging_created = not staging_dir.exists()
+
     def _create_new_cache_dir(self) -> Path:
         """
         创建新的缓存目录
 
         :return: 缓存目录路径
         """
-        new_cache_dir = self.cache_dir / str(uuid4())
+        new_cache_dir = self.staging_dir / str(uuid4())
         while new_cache_dir.exists():
-            new_cache_dir = self.cache_dir / str(uuid4())
+            new_cache_dir = self.staging_dir / str(uuid4())
+        # 先记录再创建, 进程异常退出后可清理
+        if self.journal is not None:
+            self.journal.append({"staging": str(new_cache_dir.absolute())})
         new_cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_dirs.append(new_cache_dir)
         return new_cache_dir
@@ -495,67 +1539,123 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
 
         :param archive_file: 待解压压缩包
         """
-        info_result = archive_file.info_result
-        if info_result is None:
+        if archive_file.info_result is None:
             return
 
+        self._extract_archive(archive_file)
+        self._journal_archives([archive_file])
+
+    def _extract_archive(self, archive_file: ArchiveFile):
+        """
+        解压压缩包到暂存目录, 成功后移动到输出目录
+
+        每次尝试密码单独预留暂存空间(并发尝试时各自占用), 失败后立即归还,
+        成功的尝试移动到输出目录后归还
+
+        :param archive_file: 待解压压缩包
+        """
+        info_result = archive_file.info_result
+
         logger.info(f"Extracting archive `{archive_file.path}`")
 
-        output_cache_dir = self._create_new_cache_dir()
+        # 各密码对应的缓存目录, 预留的暂存空间
+        output_cache_dirs: Dict[str, Path] = {}
+        staging_sizes: Dict[str, int] = {}
 
-        def extract_success(result: ExtractResult, level: Result_Level):
-            with self.file_lock:
-                output = get_next_not_exist_path(
-                    self.config.output_dir / archive_file.path.stem
-                )
-                shutil.move(output_cache_dir, output)
-            logger.debug(f"Extracted archive `{output_cache_dir}` to `{output}`")
-            archive_file.status = ArchiveInfoStatus.EXTRACT_SUCCESS
+        want_threads = 1
+        if self.thread_budget is not None:
+            want_threads = self._get_wanted_threads(archive_file)
 
-            if level == "warning":
-                archive_file.error = ArchiveError(
-                    message=result.message,
-                    code=result.code,
+        def extract_archive(
+            password: str, cancel_token: Optional[CancelToken]
+        ) -> Result:
+            staging_sizes[password] = self._acquire_staging(archive_file, cancel_token)
+            output_cache_dir = self._create_new_cache_dir()
+            output_cache_dirs[password] = output_cache_dir
+            with self._take_threads(want_threads) as threads:
+                result = self.sevenzip.extract(
+                    file_path=info_result.file_path,
+                    password=password,
+                    output_dir=output_cache_dir,
+                    overwrite="u",
+                    keep_dir=self.config.keep_dir,
+                    cancel_token=cancel_token,
+                    threads=threads,
                 )
-            archive_file.output = output
-
-        extract_result = SevenZipUtil.extract(
-            file_path=info_result.file_path,
-            password=info_result.password,
-            output_dir=output_cache_dir,
-            overwrite="u",
-            keep_dir=self.config.keep_dir,
-        )
-        level = self._get_result_level(extract_result)
-
-        if level in ["success", "warning"]:
-            extract_success(extract_result, level)
-            return
+            if self._get_result_level(result) == "error":
+                # 及时清理失败/被取消的缓存目录, 避免尝试大量密码时占满磁盘
+                shutil.rmtree(output_cache_dir, ignore_errors=True)
+                self._release_staging(staging_sizes.pop(password))
+            return result
+
+        first_password = self._get_first_password(archive_file)
+        passwords = [first_password] + [
+            p for p in self._get_passwords(archive_file) if p != first_password
+        ]
 
-        for password in self.passwords:
-            extract_result = SevenZipUtil.extract(
-                file_path=info_result.file_path,
-                password=password,
-                output_dir=output_cache_dir,
-                overwrite="u",
-                keep_dir=self.config.keep_dir,
+        try:
+            password, extract_result, level = self._try_passwords(
+                passwords, extract_archive
             )
+            self._publish_extracted(
+                archive_file, password, extract_result, level, output_cache_dirs
+            )
+        finally:
+            for size in staging_sizes.values():
+                self._release_staging(size)
+
+    def _publish_extracted(
+        self,
+        archive_file: ArchiveFile,
+        password: Optional[str],
+        extract_result: Result,
+        level: Result_Level,
+        output_cache_dirs: Dict[str, Path],
+    ):
+        """
+        移动解压成功的缓存目录到输出目录, 并记录解压结果
 
-            level = self._get_result_level(extract_result)
+        :param archive_file: 压缩包
+        :param password: 成功的密码(全部失败时为 None)
+        :param extract_result: 解压结果
+        :param level: 结果级别
+        :param output_cache_dirs: 各密码对应的缓存目录
+        """
+        info_result = archive_file.info_result
 
-            if level in ["success", "warning"]:
-                archive_file.info.password = password
-                extract_success(extract_result, level)
-                break
+        # 清理其余密码的缓存目录(并发尝试时可能有多个密码成功)
+        for other_password, other_cache_dir in output_cache_dirs.items():
+            if other_password != password:
+                shutil.rmtree(other_cache_dir, ignore_errors=True)
 
-            # 解压失败，生成新的缓存目录
-            output_cache_dir = self._create_new_cache_dir()
-        else:
+        if password is None:
             archive_file.status = ArchiveInfoStatus.EXTRACT_FAIL
             archive_file.error = ArchiveError(
                 message=extract_result.message,
                 code=extract_result.code,
             )
+            return
+
+        if password != info_result.password:
+            archive_file.info.password = password
+
+        output_cache_dir = output_cache_dirs[password]
+        output = self.path_reserver.reserve(
+            self.config.output_dir / archive_file.path.stem
+        )
+        # 先记录再移动, 进程异常退出后可清理未完成的输出目录
+        if self.journal is not None:
+            self.journal.append({"output": str(output.absolute())})
+        move_dir_into(output_cache_dir, output)
+        logger.debug(f"Extracted archive `{output_cache_dir}` to `{output}`")
+        archive_file.status = ArchiveInfoStatus.EXTRACT_SUCCESS
+
+        if level == "warning":
+            archive_file.error = ArchiveError(
+                message=extract_result.message,
+                code=extract_result.code,
+            )
+        archive_file.output = output
 
     def _extract_archives(self):
         """
@@ -564,19 +1664,87 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
         if self.config.mode != "extract":
             return
 
-        if not self.config.output_dir.exists():
-            self.config.output_dir.mkdir(parents=True, exist_ok=True)
+        self._prepare_output_dir()
 
-        pool = ThreadPool(self.config.thread_max)
+        pool = ThreadPool(self._get_thread_max("extract"))
 
-        for archive_file in self.archive_files:
-            if archive_file.status != ArchiveInfoStatus.LIST_SUCCESS:
-                continue
-            pool.apply_async(self._extract_archives_item, args=(archive_file,))
+        for archive_file in self._get_scheduled_archive_files():
+            pool.apply_async(
+                self._run_limited,
+                args=(
+                    "extract",
+                    self._get_archive_size(archive_file),
+                    self._extract_archives_item,
+                    archive_file,
+                ),
+            )
 
         pool.close()
         pool.join()
 
+    def _pipeline_archives(self):
+        """
+        流水线处理压缩包(识别 -> 测试/解压)
+
+        识别线程每识别完一组(同一分卷压缩包的分卷均在同一组内, 可在组内完成分卷标记),
+        即将识别成功的压缩包放入有界优先队列(按调度策略排序); 测试/解压线程从队列中取出并处理,
+        两个阶段同时进行, 不必等待全部压缩包识别完成
+        """
+        groups = self._load_archive_groups()
+
+        if self.config.mode == "extract":
+            self._prepare_output_dir()
+
+        stage: Archive_Stage = self.config.mode
+        list_thread_max = self._get_thread_max("list")
+        handle_thread_max = self._get_thread_max(stage)
+        # 队列元素: (是否为结束标记, 排序键, 序号, 压缩包)
+        archive_queue = queue.PriorityQueue(maxsize=handle_thread_max * 2)
+        counter = itertools.count()
+
+        def list_group(archive_files: List[ArchiveFile]):
+            self._run_limited(
+                "list", len(archive_files), self._list_archives_item, archive_files
+            )
+            self._mark_volumes(archive_files)
+            self._journal_archives(archive_files)
+            for archive_file in archive_files:
+                if archive_file.status == ArchiveInfoStatus.LIST_SUCCESS:
+                    key = self._get_schedule_key(archive_file)
+                    archive_queue.put((0, key, next(counter), archive_file))
+
+        def handle():
+            while True:
+                *_, archive_file = archive_queue.get()
+                if archive_file is None:
+                    return
+                if stage == "test":
+                    handle_item = self._test_archives_item
+                else:
+                    handle_item = self._extract_archives_item
+                try:
+                    size = self._get_archive_size(archive_file)
+                    self._run_limited(stage, size, handle_item, archive_file)
+                except Exception as e:
+                    # 继续处理队列, 避免识别线程阻塞
+                    logger.error(f"Handling archive `{archive_file.path}` failed: {e}")
+
+        handle_pool = ThreadPool(handle_thread_max)
+        for _ in range(handle_thread_max):
+            handle_pool.apply_async(handle)
+
+        list_pool = ThreadPool(list_thread_max)
+        for archive_files in groups:
+            list_pool.apply_async(list_group, args=(archive_files,))
+        list_pool.close()
+        list_pool.join()
+
+        # 识别完成, 通知测试/解压线程结束
+        for _ in range(handle_thread_max):
+            archive_queue.put((1, 0, next(counter), None))
+        handle_pool.close()
+        handle_pool.join()
+
     def _save_context(self):
         """
         保存上下文
@@ -651,6 +1819,10 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
         ]
 
         archive_status.count = len(self.archive_files)
+        if self.skipped_count > 0:
+            archive_status.skipped = self.skipped_count
+        if len(self.duplicate_files) > 0:
+            archive_status.duplicate = len(self.duplicate_files)
         archive_status.result_processing_mode = self.config.result_processing_mode
         archive_status.groups = groups
 
@@ -674,20 +1846,47 @@ class ArchivePlugin(Plugin[ArchivePluginConfig]):
         for cache_dir in self.cache_dirs:
             shutil.rmtree(cache_dir, ignore_errors=True)
 
+        # 删除本次执行创建的暂存目录(为空时)
+        if self.staging_created and self.staging_dir != self.cache_dir:
+            try:
+                self.staging_dir.rmdir()
+            except OSError:
+                pass
+
     def execute(self):
+        completed = False
         try:
             # 加载密码表
             self._load_passwords()
-            # 解析压缩包
-            self._list_archives()
-            # 测试压缩包
-            self._test_archives()
-            # 解压压缩包
-            self._extract_archives()
+            # 加载已处理压缩包记录
+            self._load_ledger()
+            # 打开预写日志
+            self._open_journal()
+            # 创建并发限制器
+            self._init_limiters()
+            if self.config.pipeline and self.config.mode != "list":
+                # 流水线处理压缩包
+                self._pipeline_archives()
+            else:
+                # 解析压缩包
+                self._list_archives()
+                # 测试压缩包
+                self._test_archives()
+                # 解压压缩包
+                self._extract_archives()
+            # 重复的压缩包使用首个压缩包的处理结果
+            self._resolve_duplicates()
             # 保存上下文
             self._save_context()
+            # 保存密码缓存及命中记录
+            self._save_passwords()
+            # 保存已处理压缩包记录
+            self._save_ledger()
             # 打印统计信息
             self._print_archive_stat()
+            completed = True
         finally:
             # 清理缓存文件夹
             self._clear_cache()
+            # 关闭预写日志(全部完成时删除)
+            self._close_journal(completed)
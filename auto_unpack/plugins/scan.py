@@ -1,11 +1,13 @@
 import logging
+import time
 from pathlib import Path
 from typing import List, Literal
 
 from pydantic import Field
 
 from auto_unpack.plugin import InputPluginConfig, Plugin
-from auto_unpack.store import Context, FileData, paths_excludes
+from auto_unpack.store import Context, FileData
+from auto_unpack.util.scan import scan_dir
 
 logger = logging.getLogger(__name__)
 
@@ -37,18 +39,21 @@ class ScanPlugin(Plugin[ScanPluginConfig]):
     name: str = "scan"
 
     def execute(self):
-        file_datas: List[FileData] = []
-
-        glob_func = self.config.dir.rglob if self.config.deep else self.config.dir.glob
-        for include in self.config.includes:
-            for f in glob_func(include):
-                if not self.config.include_dir and not f.is_file():
-                    continue
-                file_data = FileData(path=f, search_path=self.config.dir)
-                file_datas.append(file_data)
-
-        file_datas = paths_excludes(file_datas, self.config.excludes)
-
-        logger.info(f"Found {len(file_datas)} files")
+        start = time.perf_counter()
+
+        # 扫描结果路径均位于扫描目录下, 无需逐个校验
+        file_datas: List[FileData] = [
+            FileData.model_construct(path=f, search_path=self.config.dir)
+            for f in scan_dir(
+                self.config.dir,
+                self.config.includes,
+                self.config.excludes,
+                self.config.include_dir,
+                self.config.deep,
+            )
+        ]
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Found {len(file_datas)} files in {elapsed:.2f} s")
 
         self.save_context(Context(file_datas=file_datas))
@@ -1,16 +1,22 @@
 import logging
-import shutil
+import os
+import time
+from collections import Counter
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import List, Literal
+from typing import Dict, List, Literal, Set, Tuple
 
-from pydantic import Field
+from pydantic import Field, field_validator
 
 from auto_unpack.plugin import HandlePluginConfig, Plugin
 from auto_unpack.store import Context, FileData
-from auto_unpack.util.file import get_next_not_exist_path, path_equal
+from auto_unpack.util.file import DirIndex, copy_file, move_file
 
 logger = logging.getLogger(__name__)
 
+# 转移任务: (源路径, 目标路径, 是否覆盖已存在的目标)
+Transfer_Task = Tuple[Path, Path, bool]
+
 
 class TransferPluginConfig(HandlePluginConfig):
     """
@@ -18,8 +24,8 @@ class TransferPluginConfig(HandlePluginConfig):
     """
 
     name: Literal["transfer"] = Field(default="transfer", description="转移插件")
-    mode: Literal["move", "copy"] = Field(
-        description="转移模式\nmove: 移动\ncopy: 复制"
+    mode: Literal["move", "copy", "hardlink", "reflink", "auto"] = Field(
+        description="转移模式\nmove: 移动(跨文件系统时复制后删除源文件, 中断后可续传)\ncopy: 复制\nhardlink: 硬链接, 不支持(跨文件系统等)时复制\nreflink: 共享数据块(写时复制, btrfs/xfs 等), 不支持时复制\nauto: 依次尝试 reflink, hardlink, 均不支持时复制"
     )
     target_dir: Path = Field(description="目标路径")
     keep_structure: bool = Field(
@@ -29,6 +35,18 @@ class TransferPluginConfig(HandlePluginConfig):
         default="rename",
         description="覆盖模式(默认: rename)\nrename: 重命名\noverwrite: 覆盖\nskip: 跳过",
     )
+    thread_max: int = Field(
+        default=4,
+        description="并发转移的最大线程数(默认: 4)",
+        json_schema_extra={"minimum": 1},
+    )
+
+    @field_validator("thread_max")
+    @classmethod
+    def validate_thread_max(cls, v: int):
+        if v <= 0:
+            raise ValueError(f"Thread max should be greater than 0, but got `{v}`")
+        return v
 
 
 class TransferPlugin(Plugin[TransferPluginConfig]):
@@ -40,10 +58,75 @@ class TransferPlugin(Plugin[TransferPluginConfig]):
 
     name: str = "transfer"
 
+    def _resolve(self, path: Path, resolved_dirs: Dict[Path, str]) -> str:
+        """
+        获取绝对路径(同一目录只解析一次)
+
+        :param path: 路径
+        :param resolved_dirs: 目录绝对路径缓存
+        :return: 绝对路径
+        """
+        parent = path.parent
+        if parent not in resolved_dirs:
+            resolved_dirs[parent] = str(parent.resolve())
+        return os.path.join(resolved_dirs[parent], path.name)
+
+    def _get_next_target(
+        self, path: Path, is_dir: bool, dir_index: DirIndex, planned: Set[str]
+    ) -> Path:
+        """
+        获取下一个未被占用的目标路径
+
+        test.txt => test(1).txt => test(2).txt
+
+        :param path: 目标路径
+        :param is_dir: 是否为文件夹
+        :param dir_index: 目标目录文件索引
+        :param planned: 本次已计划转移的目标路径
+        :return: 目标路径
+        """
+        index = 1
+        new_path = path
+        while str(new_path) in planned or dir_index.exists(new_path):
+            if is_dir:
+                name = f"{path.name}({index})"
+            else:
+                name = f"{path.stem}({index}){path.suffix}"
+            new_path = path.with_name(name)
+            index += 1
+        return new_path
+
+    def _transfer(self, tasks: List[Transfer_Task]) -> List[Tuple[str, int]]:
+        """
+        按顺序执行同一目标路径的转移任务
+
+        :param tasks: 转移任务列表
+        :return: 各任务的 (转移方式, 字节数)
+        """
+        results = []
+        for src, dst, overwrite in tasks:
+            size = src.stat().st_size
+            if overwrite and dst.exists():
+                dst.unlink()
+            if self.config.mode == "move":
+                method = move_file(src, dst)
+            else:
+                method = copy_file(src, dst, self.config.mode)
+            results.append((method, size))
+        return results
+
     def execute(self):
         context = self.load_context()
+        start = time.perf_counter()
 
         new_file_datas: List[FileData] = []
+        # 同一目标路径的任务按顺序执行(覆盖模式下后者覆盖前者), 不同目标路径的任务并发执行
+        tasks: Dict[str, List[Transfer_Task]] = {}
+        # 目标目录文件索引(每个目录只读取一次)
+        dir_index = DirIndex()
+        # 本次已计划转移的目标路径
+        planned: Set[str] = set()
+        resolved_dirs: Dict[Path, str] = {}
 
         for file in context.file_datas:
             new_file = file.model_copy()
@@ -54,24 +137,48 @@ class TransferPlugin(Plugin[TransferPluginConfig]):
             else:
                 target_path = self.config.target_dir / new_file.path.name
 
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-
-            if not path_equal(target_path, new_file.path):
-                if target_path.exists():
+            if self._resolve(target_path, resolved_dirs) != self._resolve(
+                new_file.path, resolved_dirs
+            ):
+                overwrite = False
+                if str(target_path) in planned or dir_index.exists(target_path):
                     # 处理覆盖模式
                     if self.config.overwrite_mode == "overwrite":
-                        target_path.unlink()
+                        overwrite = True
                     elif self.config.overwrite_mode == "skip":
                         continue
                     elif self.config.overwrite_mode == "rename":
-                        target_path = get_next_not_exist_path(target_path)
-                if self.config.mode == "move":
-                    new_file.path.rename(target_path)
-                elif self.config.mode == "copy":
-                    shutil.copy(new_file.path, target_path)
+                        target_path = self._get_next_target(
+                            target_path, new_file.path.is_dir(), dir_index, planned
+                        )
+                planned.add(str(target_path))
+                tasks.setdefault(str(target_path), []).append(
+                    (new_file.path, target_path, overwrite)
+                )
 
             new_file.path = target_path
             new_file.search_path = self.config.target_dir
             new_file_datas.append(new_file)
 
+        # 目标目录只创建一次
+        target_dirs = {task[0][1].parent for task in tasks.values()}
+        for target_dir in target_dirs:
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+        pool = ThreadPool(self.config.thread_max)
+        try:
+            results = [r for rs in pool.map(self._transfer, tasks.values()) for r in rs]
+        finally:
+            pool.close()
+            pool.join()
+
+        if len(results) > 0:
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            size_mb = sum(size for _, size in results) / 1024 / 1024
+            methods = dict(Counter(method for method, _ in results))
+            logger.info(
+                f"Transferred {len(results)} files ({size_mb:.1f} MB) in "
+                f"{elapsed:.2f} s, {size_mb / elapsed:.1f} MB/s, methods: {methods}"
+            )
+
         self.save_context(Context(file_datas=new_file_datas))
@@ -0,0 +1,386 @@
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from .exec import CancelToken
+
+logger = logging.getLogger(__name__)
+
+# 每核可运行进程数(或 1 分钟平均负载)超过该值时视为 CPU 过载
+CPU_LOAD_HIGH = 1.0
+# 统计窗口内 CPU 使用率达到该值时视为 CPU 占满
+CPU_USAGE_HIGH = 0.95
+# 平均负载的统计周期(秒), 按平均负载判断过载时每个周期最多减少一次
+LOADAVG_PERIOD = 60.0
+# 磁盘正在处理的 I/O 请求数超过该值时视为磁盘过载
+DISK_QUEUE_HIGH = 16
+# 吞吐量下降超过该比例时才视为下降
+THROUGHPUT_TOLERANCE = 0.05
+# 过载时并发数的缩减比例
+DECREASE_FACTOR = 0.75
+# 等待空间时检查取消的间隔(秒)
+CANCEL_CHECK_INTERVAL = 0.5
+
+# CPU 状态文件(Linux)
+CPU_STAT_PATH = Path("/proc/stat")
+# 磁盘状态文件(Linux)
+DISKSTATS_PATH = Path("/proc/diskstats")
+# 忽略的虚拟块设备
+VIRTUAL_DEVICE_PATTERN = r"^(loop|ram|zram|dm-|md)\d*"
+
+
+def get_cpu_load() -> Optional[float]:
+    """
+    获取每核 1 分钟平均负载
+
+    :return: 每核平均负载, 不支持时(Windows)返回 None
+    """
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+    return load / (os.cpu_count() or 1)
+
+
+def get_cpu_times() -> Optional[Tuple[int, int, int]]:
+    """
+    获取 CPU 累计时间及可运行进程数
+
+    :return: (忙碌时间, 总时间, 可运行进程数), 不支持时(非 Linux)返回 None
+    """
+    try:
+        lines = CPU_STAT_PATH.read_text().splitlines()
+    except OSError:
+        return None
+
+    busy = total = running = 0
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 2:
+            continue
+        if fields[0] == "cpu":
+            # user nice system idle iowait irq softirq steal ...(guest 已计入 user)
+            values = [int(v) for v in fields[1:9]]
+            total = sum(values)
+            busy = total - values[3] - (values[4] if len(values) > 4 else 0)
+        elif fields[0] == "procs_running":
+            running = int(fields[1])
+    return busy, total, running
+
+
+def get_disk_queue_depth() -> Optional[int]:
+    """
+    获取磁盘正在处理的 I/O 请求数(所有物理磁盘之和)
+
+    :return: I/O 请求数, 不支持时(非 Linux)返回 None
+    """
+    try:
+        lines = DISKSTATS_PATH.read_text().splitlines()
+    except OSError:
+        return None
+
+    depth = 0
+    for line in lines:
+        fields = line.split()
+        # major minor name reads ... writes ... in_progress(第 12 列) ...
+        if len(fields) < 12 or re.match(VIRTUAL_DEVICE_PATTERN, fields[2]):
+            continue
+        depth += int(fields[11])
+    return depth
+
+
+class AdaptiveLimiter:
+    """
+    自适应并发限制器
+
+    限制同时执行的任务数; 自适应模式下按 AIMD(加性增, 乘性减)策略周期性调整并发数:
+    CPU 或磁盘过载时按比例减少, 否则逐个增加, 增加后吞吐量反而下降时回退并保持一个周期
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        adaptive: bool = False,
+        interval: float = 2.0,
+    ):
+        """
+        :param name: 名称(日志使用)
+        :param max_limit: 最大并发数
+        :param adaptive: 是否自适应调整并发数(False: 固定为最大并发数)
+        :param interval: 调整间隔(秒)
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.adaptive = adaptive
+        self.interval = interval
+
+        self._cond = threading.Condition()
+        self._active = 0
+        # 自适应模式从 CPU 核数开始调整
+        self._limit = max_limit
+        if adaptive:
+            self._limit = max(1, min(max_limit, os.cpu_count() or 1))
+
+        # 当前统计窗口
+        self._window_start = time.monotonic()
+        self._window_work = 0.0
+        # 上个统计窗口的吞吐量
+        self._last_throughput: Optional[float] = None
+        # 上次调整方向(1: 增加, -1: 减少, 0: 未调整)
+        self._last_step = 0
+        # 统计窗口开始时的 CPU 累计时间
+        self._cpu_times = get_cpu_times()
+        # 上次按平均负载减少并发数的时间
+        self._loadavg_decrease_time: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """
+        当前并发数上限
+        """
+        return self._limit
+
+    def acquire(self):
+        """
+        获取执行许可, 达到并发数上限时等待
+        """
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, work: float = 1):
+        """
+        释放执行许可
+
+        :param work: 完成的工作量(用于计算吞吐量, 如处理的字节数)
+        """
+        with self._cond:
+            self._active -= 1
+            self._window_work += work
+            if self.adaptive:
+                self._adjust()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, work: float = 1) -> Iterator[None]:
+        """
+        在并发限制内执行
+
+        :param work: 工作量
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release(work)
+
+    def _get_cpu_overload(self, now: float) -> Tuple[bool, Optional[float]]:
+        """
+        判断 CPU 是否过载(需持有锁)
+
+        Linux 下使用统计窗口内的 CPU 使用率(/proc/stat 差值),
+        CPU 占满且可运行进程数超过核数时视为过载;
+        其他系统使用 1 分钟平均负载, 负载下降后仍会持续偏高,
+        每个平均负载统计周期最多据此减少一次
+
+        :param now: 当前时间
+        :return: (是否过载, CPU 使用率或每核平均负载(日志使用))
+        """
+        cpu_times = get_cpu_times()
+        if cpu_times is not None and self._cpu_times is not None:
+            busy = cpu_times[0] - self._cpu_times[0]
+            total = cpu_times[1] - self._cpu_times[1]
+            self._cpu_times = cpu_times
+            if total <= 0:
+                return False, None
+            usage = busy / total
+            running = cpu_times[2] / (os.cpu_count() or 1)
+            return usage >= CPU_USAGE_HIGH and running > CPU_LOAD_HIGH, usage
+
+        cpu_load = get_cpu_load()
+        if cpu_load is None or cpu_load <= CPU_LOAD_HIGH:
+            return False, cpu_load
+        if (
+            self._loadavg_decrease_time is not None
+            and now - self._loadavg_decrease_time < LOADAVG_PERIOD
+        ):
+            return False, cpu_load
+        self._loadavg_decrease_time = now
+        return True, cpu_load
+
+    def _adjust(self):
+        """
+        根据统计窗口内的吞吐量及系统负载调整并发数(需持有锁)
+        """
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+
+        throughput = self._window_work / elapsed
+        last_throughput = self._last_throughput
+        self._window_start = now
+        self._window_work = 0.0
+        self._last_throughput = throughput
+
+        cpu_overloaded, cpu_load = self._get_cpu_overload(now)
+        disk_queue_depth = get_disk_queue_depth()
+        overloaded = cpu_overloaded or (
+            disk_queue_depth is not None and disk_queue_depth > DISK_QUEUE_HIGH
+        )
+
+        limit = self._limit
+        if overloaded:
+            # 乘性减
+            limit = min(limit - 1, int(limit * DECREASE_FACTOR))
+        elif (
+            self._last_step > 0
+            and last_throughput is not None
+            and throughput < last_throughput * (1 - THROUGHPUT_TOLERANCE)
+        ):
+            # 增加并发数后吞吐量下降, 回退
+            limit -= 1
+        elif self._last_step < 0:
+            # 减少并发数后保持一个周期, 避免频繁波动
+            pass
+        else:
+            # 加性增
+            limit += 1
+
+        limit = max(1, min(self.max_limit, limit))
+        self._last_step = (limit > self._limit) - (limit < self._limit)
+        if limit != self._limit:
+            logger.debug(
+                f"Concurrency of `{self.name}` {self._limit} -> {limit} "
+                f"(throughput: {throughput:.1f}/s, cpu: {cpu_load}, "
+                f"disk queue: {disk_queue_depth})"
+            )
+            self._limit = limit
+
+
+class ThreadBudget:
+    """
+    线程预算
+
+    多个进程共享固定数量的线程, 每个进程按需申请线程数;
+    剩余线程不足时按剩余数量分配(至少 1 个), 没有剩余线程时等待其他进程归还
+    """
+
+    def __init__(self, total: int):
+        """
+        :param total: 线程总数
+        """
+        self.total = total
+        self._cond = threading.Condition()
+        self._available = total
+
+    def acquire(self, want: int) -> int:
+        """
+        申请线程
+
+        :param want: 期望的线程数
+        :return: 分配到的线程数
+        """
+        with self._cond:
+            while self._available <= 0:
+                self._cond.wait()
+            threads = max(1, min(want, self._available))
+            self._available -= threads
+            return threads
+
+    def release(self, threads: int):
+        """
+        归还线程
+
+        :param threads: 线程数
+        """
+        with self._cond:
+            self._available += threads
+            self._cond.notify_all()
+
+    @contextmanager
+    def take(self, want: int) -> Iterator[int]:
+        """
+        在线程预算内执行
+
+        :param want: 期望的线程数
+        :return: 分配到的线程数
+        """
+        threads = self.acquire(want)
+        try:
+            yield threads
+        finally:
+            self.release(threads)
+
+
+class SpaceBudget:
+    """
+    空间预算
+
+    任务开始前按预估大小预留空间, 结束后归还; 已预留空间加上新任务大小超过总量时等待,
+    没有其他任务占用空间时, 超过总量的单个任务仍可执行(避免永久等待)
+    """
+
+    def __init__(self, total: int):
+        """
+        :param total: 空间总量(字节)
+        """
+        self.total = total
+        self._cond = threading.Condition()
+        self._used = 0
+
+    @property
+    def used(self) -> int:
+        """
+        已预留空间(字节)
+        """
+        return self._used
+
+    def acquire(self, size: int, cancel_token: Optional[CancelToken] = None) -> bool:
+        """
+        预留空间, 空间不足时等待
+
+        :param size: 大小(字节)
+        :param cancel_token: 取消令牌(取消后不再等待)
+        :return: 是否预留成功(等待时被取消返回 False)
+        """
+        with self._cond:
+            while self._used > 0 and self._used + size > self.total:
+                if cancel_token is None:
+                    self._cond.wait()
+                    continue
+                if cancel_token.cancelled:
+                    return False
+                self._cond.wait(CANCEL_CHECK_INTERVAL)
+            self._used += size
+            return True
+
+    def release(self, size: int):
+        """
+        归还空间
+
+        :param size: 大小(字节)
+        """
+        with self._cond:
+            self._used -= size
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        """
+        在空间预算内执行
+
+        :param size: 大小(字节)
+        """
+        self.acquire(size)
+        try:
+            yield
+        finally:
+            self.release(size)
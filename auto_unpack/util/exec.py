@@ -1,24 +1,189 @@
+import codecs
+import io
 import logging
+import os
 import subprocess
-from typing import List, Tuple
+import threading
+from typing import Iterator, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 
-def exec_cmd(cmds: List[str], decode: str = "utf-8") -> Tuple[int, str]:
+# 取消执行时返回的状态码(同 7-zip: User stopped the process)
+CANCELLED_CODE = 255
+# 读取输出的数据块大小
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class CancelToken:
+    """
+    命令取消令牌
+
+    多个命令共享同一令牌, 调用 cancel 后结束所有正在执行的命令, 且不再启动新命令
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._procs: Set[subprocess.Popen] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        是否已取消
+        """
+        return self._cancelled
+
+    def register(self, proc: subprocess.Popen) -> bool:
+        """
+        登记正在执行的进程
+
+        :param proc: 进程
+        :return: 是否登记成功(已取消时直接结束进程)
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._procs.add(proc)
+                return True
+        kill_proc(proc)
+        return False
+
+    def unregister(self, proc: subprocess.Popen):
+        """
+        注销进程
+
+        :param proc: 进程
+        """
+        with self._lock:
+            self._procs.discard(proc)
+
+    def cancel(self):
+        """
+        取消执行, 结束所有已登记的进程
+        """
+        with self._lock:
+            self._cancelled = True
+            procs = list(self._procs)
+            self._procs.clear()
+        for proc in procs:
+            kill_proc(proc)
+
+
+def kill_proc(proc: subprocess.Popen):
+    """
+    结束进程
+
+    :param proc: 进程
+    """
+    if proc.poll() is not None:
+        return
+    try:
+        proc.kill()
+    except Exception as e:
+        logger.debug(f"Kill process {proc.pid} failed: {e}")
+
+
+def _popen(cmds: List[str]) -> subprocess.Popen:
+    """
+    启动进程
+
+    直接以参数列表启动进程(不经过 shell), 参数无需转义;
+    POSIX 下满足条件时 subprocess 使用 posix_spawn/vfork 快速启动进程
+
+    :param cmds: 命令参数列表
+    :return: 进程
+    """
+    return subprocess.Popen(
+        cmds,
+        stdin=None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        shell=False,
+        # close_fds=False 时 subprocess 才会使用 posix_spawn
+        # python 默认创建的文件描述符不可继承, 不会泄露给子进程
+        close_fds=os.name == "nt",
+    )
+
+
+def exec_cmd(
+    cmds: List[str], decode: str = "utf-8", cancel_token: Optional[CancelToken] = None
+) -> Tuple[int, str]:
     """
     调用命令行
 
     :param decode: 编码格式
-    :param cmd: 命令
+    :param cmds: 命令参数列表
+    :param cancel_token: 取消令牌
     :return: 状态码，返回信息
     """
-    with subprocess.Popen(
-        " ".join(cmds),
-        stdin=None,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        shell=True,
-    ) as proc:
-        info, _ = proc.communicate()
-        return proc.returncode, info.decode(decode, errors="ignore")
+    if cancel_token is not None and cancel_token.cancelled:
+        return CANCELLED_CODE, ""
+
+    with _popen(cmds) as proc:
+        if cancel_token is not None and not cancel_token.register(proc):
+            proc.wait()
+            return CANCELLED_CODE, ""
+        try:
+            # 边读取边解码, 避免一次性缓存全部输出
+            decoder = codecs.getincrementaldecoder(decode)(errors="ignore")
+            chunks: List[str] = []
+            while True:
+                data = proc.stdout.read1(READ_BLOCK_SIZE)
+                if not data:
+                    break
+                chunks.append(decoder.decode(data))
+            chunks.append(decoder.decode(b"", final=True))
+            proc.wait()
+        finally:
+            if cancel_token is not None:
+                cancel_token.unregister(proc)
+        return proc.returncode, "".join(chunks)
+
+
+class CmdLines:
+    """
+    逐行读取命令输出
+
+    边执行边返回输出行, 内存占用与单行输出成正比; 迭代结束后可通过 code 获取状态码,
+    提前结束迭代时结束进程
+    """
+
+    def __init__(
+        self,
+        cmds: List[str],
+        decode: str = "utf-8",
+        cancel_token: Optional[CancelToken] = None,
+    ):
+        self.cmds = cmds
+        self.decode = decode
+        self.cancel_token = cancel_token
+        # 状态码(迭代结束后可用)
+        self.code: Optional[int] = None
+
+    def __iter__(self) -> Iterator[str]:
+        cancel_token = self.cancel_token
+        if cancel_token is not None and cancel_token.cancelled:
+            self.code = CANCELLED_CODE
+            return
+
+        with _popen(self.cmds) as proc:
+            if cancel_token is not None and not cancel_token.register(proc):
+                proc.wait()
+                self.code = CANCELLED_CODE
+                return
+            try:
+                reader = io.TextIOWrapper(
+                    proc.stdout, encoding=self.decode, errors="ignore", newline=""
+                )
+                for line in reader:
+                    yield line.rstrip("\r\n")
+                proc.wait()
+                self.code = proc.returncode
+            finally:
+                if proc.poll() is None:
+                    # 提前结束迭代
+                    kill_proc(proc)
+                    proc.wait()
+                    self.code = CANCELLED_CODE
+                if cancel_token is not None:
+                    cancel_token.unregister(proc)
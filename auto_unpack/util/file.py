@@ -1,9 +1,46 @@
+import errno
+import hashlib
+import itertools
 import os
+import shutil
+import sys
+import threading
 from pathlib import Path
-from typing import Any, List
+from typing import IO, Any, Dict, FrozenSet, Iterator, List, Literal
 
 from ruamel.yaml import YAML
 
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+# ioctl FICLONE(Linux): 目标文件与源文件共享数据块(写时复制)
+FICLONE = 0x40049409
+# copy_file_range 单次复制的最大字节数
+COPY_RANGE_SIZE = 1024 * 1024 * 1024
+# 跨设备移动(sendfile 不可用)时的缓冲区大小
+MOVE_BLOCK_SIZE = 1024 * 1024
+# 跨设备移动续传前校验的数据块大小(已复制部分的末尾)
+MOVE_VERIFY_SIZE = 64 * 1024
+# copy_file_range 不支持时(跨文件系统, 内核/文件系统不支持等)的错误码
+COPY_RANGE_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+# 复制方式
+# copy: 复制文件数据
+# hardlink: 硬链接, 不支持时复制
+# reflink: 共享数据块(写时复制, btrfs/xfs 等), 不支持时复制
+# auto: 依次尝试 reflink, hardlink, 均不支持时复制
+Copy_Mode = Literal["copy", "hardlink", "reflink", "auto"]
+
 
 def read_file(file_path: Path) -> str:
     """
@@ -128,3 +165,381 @@ def clean_empty_dir(dir_path: Path):
 
         if len(os.listdir(path)) == 0:
             path.rmdir()
+
+
+def get_device(path: Path) -> int:
+    """
+    获取路径所在的设备(路径不存在时取最近的已存在上级目录)
+
+    :param path: 路径
+    :return: 设备号
+    """
+    path = path.absolute()
+    while not path.exists() and path.parent != path:
+        path = path.parent
+    return path.stat().st_dev
+
+
+def is_same_device(path: Path, other: Path) -> bool:
+    """
+    判断两个路径是否位于同一设备(文件系统), 同一设备内移动文件只需重命名
+
+    :param path: 路径
+    :param other: 另一个路径
+    :return: 是否位于同一设备
+    """
+    return get_device(path) == get_device(other)
+
+
+def file_fingerprint(file_path: Path, block_size: int = 64 * 1024) -> str:
+    """
+    计算文件指纹
+
+    由文件大小、修改时间、首尾数据块哈希组成, 无需读取整个文件
+
+    :param file_path: 文件路径
+    :param block_size: 首尾数据块大小
+    :return: 文件指纹
+    """
+    stat = file_path.stat()
+    sha1 = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        sha1.update(f.read(block_size))
+        if stat.st_size > block_size:
+            f.seek(max(block_size, stat.st_size - block_size))
+            sha1.update(f.read(block_size))
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{sha1.hexdigest()}"
+
+
+def reflink_file(src: Path, dst: Path):
+    """
+    以共享数据块(写时复制)的方式复制文件, 无需读写文件数据
+
+    :param src: 源文件
+    :param dst: 目标文件(不存在)
+    :raises OSError: 系统或文件系统不支持
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "Reflink is not supported")
+    with open(src, "rb") as src_file, open(dst, "xb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            dst_file.close()
+            dst.unlink()
+            raise
+    shutil.copymode(src, dst)
+
+
+def copy_file_data(src: Path, dst: Path):
+    """
+    复制文件数据及权限
+
+    Linux 下优先使用 copy_file_range 在内核中复制(部分文件系统可直接共享数据块或由服务端复制),
+    不支持时回退至 shutil.copy(Linux 下使用 sendfile, 其他系统使用缓冲区复制)
+
+    :param src: 源文件
+    :param dst: 目标文件
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                size = os.fstat(src_file.fileno()).st_size
+                copied = 0
+                while copied < size:
+                    count = copy_file_range(
+                        src_file.fileno(), dst_file.fileno(), COPY_RANGE_SIZE
+                    )
+                    if count == 0:
+                        break
+                    copied += count
+            # 部分文件系统返回 0 但并未复制完成, 回退至普通复制
+            if copied >= size:
+                shutil.copymode(src, dst)
+                return
+        except OSError as e:
+            if e.errno not in COPY_RANGE_UNSUPPORTED_ERRNOS:
+                raise
+    shutil.copy(src, dst)
+
+
+def copy_file(src: Path, dst: Path, mode: Copy_Mode = "copy") -> str:
+    """
+    复制文件, 按复制方式优先使用链接, 均不支持(跨文件系统等)时复制文件数据
+
+    :param src: 源文件
+    :param dst: 目标文件(不存在)
+    :param mode: 复制方式
+    :return: 实际使用的复制方式(copy, hardlink, reflink)
+    """
+    methods = {
+        "copy": [],
+        "hardlink": ["hardlink"],
+        "reflink": ["reflink"],
+        "auto": ["reflink", "hardlink"],
+    }[mode]
+    for method in methods:
+        try:
+            if method == "reflink":
+                reflink_file(src, dst)
+            else:
+                os.link(src, dst)
+            return method
+        except OSError:
+            continue
+    copy_file_data(src, dst)
+    return "copy"
+
+
+def _fsync_dir(dir_path: Path):
+    """
+    同步目录(确保目录项变更写入磁盘, Windows 不支持)
+
+    :param dir_path: 目录路径
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _get_resume_offset(src_file: IO[bytes], part_file: IO[bytes]) -> int:
+    """
+    获取可续传的位置
+
+    临时文件不大于源文件且末尾数据块与源文件对应位置一致时, 从临时文件末尾继续复制
+
+    :param src_file: 源文件
+    :param part_file: 临时文件
+    :return: 续传位置(不可续传时为 0)
+    """
+    part_size = os.fstat(part_file.fileno()).st_size
+    if part_size == 0 or part_size > os.fstat(src_file.fileno()).st_size:
+        return 0
+    verify_offset = max(0, part_size - MOVE_VERIFY_SIZE)
+    src_file.seek(verify_offset)
+    part_file.seek(verify_offset)
+    if src_file.read(MOVE_VERIFY_SIZE) != part_file.read(MOVE_VERIFY_SIZE):
+        return 0
+    return part_size
+
+
+def _copy_stream(src_file: IO[bytes], dst_file: IO[bytes], offset: int):
+    """
+    从指定位置开始复制文件数据(目标文件当前位置需与 offset 一致)
+
+    Linux 下使用 sendfile 在内核中复制, 不支持时使用缓冲区复制
+
+    :param src_file: 源文件
+    :param dst_file: 目标文件
+    :param offset: 起始位置
+    """
+    size = os.fstat(src_file.fileno()).st_size
+    if sys.platform.startswith("linux"):
+        try:
+            while offset < size:
+                count = os.sendfile(
+                    dst_file.fileno(),
+                    src_file.fileno(),
+                    offset,
+                    min(size - offset, COPY_RANGE_SIZE),
+                )
+                if count == 0:
+                    break
+                offset += count
+            return
+        except OSError as e:
+            if e.errno not in COPY_RANGE_UNSUPPORTED_ERRNOS:
+                raise
+            dst_file.seek(offset)
+
+    src_file.seek(offset)
+    while True:
+        data = src_file.read(MOVE_BLOCK_SIZE)
+        if not data:
+            break
+        dst_file.write(data)
+
+
+def move_file(src: Path, dst: Path) -> str:
+    """
+    移动文件
+
+    先直接重命名, 跨设备(EXDEV)时再流式复制到临时文件(.part),
+    同步到磁盘后重命名为目标文件, 最后删除源文件, 中断后再次移动时从临时文件末尾续传
+
+    :param src: 源文件
+    :param dst: 目标文件
+    :return: 实际使用的移动方式(rename, copy)
+    """
+    try:
+        os.rename(src, dst)
+        return "rename"
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    if src.is_dir():
+        shutil.move(str(src), str(dst))
+        return "copy"
+
+    part = dst.with_name(f"{dst.name}.part")
+    part_mode = "r+b" if part.exists() else "w+b"
+    with open(src, "rb") as src_file, open(part, part_mode) as part_file:
+        offset = _get_resume_offset(src_file, part_file)
+        part_file.truncate(offset)
+        part_file.seek(offset)
+        _copy_stream(src_file, part_file, offset)
+        part_file.flush()
+        os.fsync(part_file.fileno())
+    shutil.copystat(src, part)
+    os.replace(part, dst)
+    _fsync_dir(dst.parent)
+    src.unlink()
+    return "copy"
+
+
+def file_hash(file_path: Path, block_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容哈希(sha256)
+
+    按数据块流式读取, 内存占用与文件大小无关
+
+    :param file_path: 文件路径
+    :param block_size: 数据块大小
+    :return: 哈希值
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            sha256.update(data)
+    return sha256.hexdigest()
+
+
+class DirIndex:
+    """
+    目录文件索引
+
+    每个目录仅读取一次文件名列表, 之后判断文件是否存在只需查询集合, 无需再访问文件系统
+    (网络共享目录下每次 stat 都是一次网络往返); 线程安全, 可在多个线程间共享
+
+    文件名经 os.path.normcase 处理后比较,
+    与直接判断路径是否存在的结果一致(Windows 下不区分大小写)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, FrozenSet[str]] = {}
+
+    def names(self, dir_path: Path) -> FrozenSet[str]:
+        """
+        获取目录下的文件名
+
+        :param dir_path: 目录路径
+        :return: 文件名集合(经 os.path.normcase 处理), 目录不存在时为空集合
+        """
+        key = str(dir_path)
+        names = self._dirs.get(key)
+        if names is not None:
+            return names
+
+        try:
+            names = frozenset(os.path.normcase(n) for n in os.listdir(dir_path))
+        except OSError:
+            names = frozenset()
+
+        with self._lock:
+            return self._dirs.setdefault(key, names)
+
+    def exists(self, path: Path) -> bool:
+        """
+        判断文件是否存在
+
+        :param path: 文件路径
+        :return: 是否存在
+        """
+        return os.path.normcase(path.name) in self.names(path.parent)
+
+    def clear(self):
+        """
+        清空索引
+        """
+        with self._lock:
+            self._dirs.clear()
+
+
+class PathReserver:
+    """
+    目录名预留
+
+    test => test(1) => test(2), 通过 mkdir 原子地创建空目录占用名称,
+    多个线程同时预留同名目录也不会冲突; 每个名称记录下次尝试的序号,
+    无需每次从头逐个判断路径是否存在, 且不需要全局锁
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Iterator[int]] = {}
+
+    def reserve(self, path: Path) -> Path:
+        """
+        预留目录名(创建空目录)
+
+        :param path: 期望的目录路径(上级目录需存在)
+        :return: 预留的目录路径
+        """
+        # dict.setdefault 及 next(itertools.count) 均为原子操作, 各线程获取的序号不重复
+        counter = self._counters.setdefault(str(path), itertools.count())
+        while True:
+            index = next(counter)
+            new_path = path if index == 0 else path.with_name(f"{path.name}({index})")
+            try:
+                new_path.mkdir()
+                return new_path
+            except FileExistsError:
+                continue
+
+
+def get_part_dir(dst_dir: Path) -> Path:
+    """
+    获取移动目录时使用的临时目录(与目标目录同级)
+
+    :param dst_dir: 目标目录
+    :return: 临时目录路径
+    """
+    return dst_dir.with_name(f".{dst_dir.name}.part")
+
+
+def move_dir_into(src_dir: Path, dst_dir: Path):
+    """
+    将目录移动到已预留的空目录
+
+    同一文件系统下直接重命名(POSIX 下可覆盖空目录), 否则先逐个移动目录下的文件到
+    同级的临时目录, 全部完成后再重命名为目标目录, 目标目录中不会出现移动到一半的内容
+
+    :param src_dir: 源目录
+    :param dst_dir: 目标空目录
+    """
+    try:
+        os.rename(src_dir, dst_dir)
+        return
+    except OSError:
+        pass
+    part_dir = get_part_dir(dst_dir)
+    if part_dir.exists():
+        shutil.rmtree(part_dir)
+    part_dir.mkdir()
+    for child in src_dir.iterdir():
+        shutil.move(str(child), str(part_dir / child.name))
+    src_dir.rmdir()
+    try:
+        os.rename(part_dir, dst_dir)
+    except OSError:
+        # Windows 下不可重命名为已存在的目录
+        dst_dir.rmdir()
+        os.rename(part_dir, dst_dir)
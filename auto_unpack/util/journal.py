@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+# 同步策略
+# always: 每条记录写入后立即同步到磁盘
+# batch: 每条记录写入后刷新到系统缓冲区(进程被结束不丢失), 每隔一段时间同步到磁盘
+# never: 仅刷新到系统缓冲区, 由系统决定何时同步到磁盘
+Journal_Sync = Literal["always", "batch", "never"]
+
+
+class Journal:
+    """
+    预写日志
+
+    以 JSON Lines 格式追加记录, 进程异常退出后可读取已写入的记录恢复状态;
+    首行为日志头, 重新打开时日志头一致才继续使用之前的记录
+    """
+
+    def __init__(
+        self, file_path: Path, sync: Journal_Sync = "batch", sync_interval: float = 1.0
+    ):
+        """
+        :param file_path: 日志文件路径
+        :param sync: 同步策略
+        :param sync_interval: batch 策略下的同步间隔(秒)
+        """
+        self.file_path = file_path
+        self.sync = sync
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._last_sync = 0.0
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """
+        读取日志记录, 忽略不完整(写入时中断)的记录
+
+        :return: 记录列表
+        """
+        if not self.file_path.exists():
+            return []
+
+        records = []
+        with open(self.file_path, encoding="utf8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(
+                        f"Ignored broken journal record in `{self.file_path}`"
+                    )
+        return records
+
+    def open(self, header: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        打开日志
+
+        日志已存在且日志头一致时返回之前的记录并继续追加, 否则重新创建日志
+
+        :param header: 日志头
+        :return: 之前的记录
+        """
+        records = self._read()
+        if len(records) > 0 and records[0] == header:
+            records = records[1:]
+        else:
+            records = []
+
+        # 重写日志(去除不完整的记录), 再以追加方式打开
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.file_path.with_name(f"{self.file_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf8") as f:
+            for record in [header] + records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.file_path)
+
+        self._file = open(self.file_path, "a", encoding="utf8")
+        self._last_sync = time.monotonic()
+        return records
+
+    def append(self, record: Dict[str, Any]):
+        """
+        追加记录
+
+        :param record: 记录
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            now = time.monotonic()
+            if self.sync == "always" or (
+                self.sync == "batch" and now - self._last_sync >= self.sync_interval
+            ):
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+
+    def close(self, remove: bool = False):
+        """
+        关闭日志
+
+        :param remove: 是否删除日志文件(全部处理完成, 无需恢复)
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            if self.sync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            if remove:
+                self.file_path.unlink()
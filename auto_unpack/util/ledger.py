@@ -0,0 +1,136 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerRecord(NamedTuple):
+    """
+    压缩包记录
+    """
+
+    # 文件大小
+    size: int
+    # 修改时间(纳秒)
+    mtime_ns: int
+    # 文件指纹(未启用时为 None)
+    fingerprint: Optional[str] = None
+
+
+class ArchiveLedger:
+    """
+    已处理压缩包记录
+
+    使用 SQLite 持久化保存各处理模式下处理成功的压缩包(路径 + 大小 + 修改时间 + 可选指纹),
+    再次执行时跳过未变化的压缩包
+    """
+
+    def __init__(self, file_path: Path, mode: str):
+        """
+        :param file_path: 记录文件路径
+        :param mode: 处理模式
+        """
+        self.file_path = file_path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._records: Dict[str, LedgerRecord] = {}
+        self._changed: Dict[str, LedgerRecord] = {}
+        self.load()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        连接记录文件, 不存在时创建
+        """
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.file_path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS archives ("
+            "mode TEXT NOT NULL, "
+            "path TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, "
+            "fingerprint TEXT, "
+            "processed_at REAL NOT NULL, "
+            "PRIMARY KEY (mode, path))"
+        )
+        return conn
+
+    def load(self):
+        """
+        加载当前处理模式的记录
+        """
+        self._records = {}
+        self._changed = {}
+        if not self.file_path.exists():
+            return
+
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT path, size, mtime_ns, fingerprint FROM archives "
+                    "WHERE mode = ?",
+                    (self.mode,),
+                )
+                for path, size, mtime_ns, fingerprint in rows:
+                    self._records[path] = LedgerRecord(size, mtime_ns, fingerprint)
+        except sqlite3.Error as e:
+            logger.warning(f"Load archive ledger `{self.file_path}` failed: {e}")
+
+        logger.debug(
+            f"Loaded {len(self._records)} processed archives from `{self.file_path}`"
+        )
+
+    def get(self, path: str) -> Optional[LedgerRecord]:
+        """
+        获取压缩包记录
+
+        :param path: 压缩包绝对路径
+        :return: 记录, 未记录时返回 None
+        """
+        with self._lock:
+            return self._records.get(path, None)
+
+    def put(self, path: str, record: LedgerRecord):
+        """
+        记录处理成功的压缩包
+
+        :param path: 压缩包绝对路径
+        :param record: 记录
+        """
+        with self._lock:
+            if self._records.get(path, None) == record:
+                return
+            self._records[path] = record
+            self._changed[path] = record
+
+    def save(self):
+        """
+        保存新增/变化的记录
+        """
+        with self._lock:
+            if len(self._changed) == 0:
+                return
+            now = time.time()
+            rows = [
+                (self.mode, path, r.size, r.mtime_ns, r.fingerprint, now)
+                for path, r in self._changed.items()
+            ]
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO archives "
+                        "(mode, path, size, mtime_ns, fingerprint, processed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Save archive ledger `{self.file_path}` failed: {e}")
+                return
+            self._changed = {}
+
+        logger.debug(f"Saved {len(rows)} processed archives to `{self.file_path}`")
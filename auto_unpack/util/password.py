@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file import read_file, write_file
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordCache:
+    """
+    密码缓存
+
+    以压缩包指纹为 key 持久化保存可用密码, 再次处理相同压缩包时直接使用
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._passwords: Dict[str, str] = {}
+        self._changed = False
+        self.load()
+
+    def load(self):
+        """
+        加载密码缓存文件
+        """
+        self._passwords = {}
+        if not self.file_path.exists():
+            return
+
+        try:
+            passwords = json.loads(read_file(self.file_path))
+            if isinstance(passwords, dict):
+                self._passwords = {str(k): str(v) for k, v in passwords.items()}
+        except Exception as e:
+            logger.warning(f"Load password cache `{self.file_path}` failed: {e}")
+
+        logger.debug(
+            f"Loaded {len(self._passwords)} cached passwords from `{self.file_path}`"
+        )
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """
+        获取缓存密码
+
+        :param fingerprint: 压缩包指纹
+        :return: 密码, 未缓存时返回 None
+        """
+        with self._lock:
+            return self._passwords.get(fingerprint, None)
+
+    def put(self, fingerprint: str, password: str):
+        """
+        缓存密码
+
+        :param fingerprint: 压缩包指纹
+        :param password: 密码
+        """
+        with self._lock:
+            if self._passwords.get(fingerprint, None) == password:
+                return
+            self._passwords[fingerprint] = password
+            self._changed = True
+
+    def save(self):
+        """
+        保存密码缓存文件
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            write_file(
+                self.file_path,
+                json.dumps(self._passwords, ensure_ascii=False, indent=2),
+            )
+            self._changed = False
+
+        logger.debug(f"Password cache saved to `{self.file_path}`")
+
+
+class PasswordRanker:
+    """
+    密码排序器
+
+    持久化记录各密码的命中次数, 按命中次数从高到低排序密码, 次数相同时保持原顺序
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        # 全局命中次数 password => count
+        self._hits: Dict[str, int] = {}
+        # 分组命中次数 scope => password => count
+        self._scope_hits: Dict[str, Dict[str, int]] = {}
+        self._changed = False
+        self.load()
+
+    def load(self):
+        """
+        加载命中记录文件
+        """
+        self._hits = {}
+        self._scope_hits = {}
+        if not self.file_path.exists():
+            return
+
+        try:
+            data = json.loads(read_file(self.file_path))
+            self._hits = {str(k): int(v) for k, v in data.get("hits", {}).items()}
+            self._scope_hits = {
+                str(scope): {str(k): int(v) for k, v in hits.items()}
+                for scope, hits in data.get("scope_hits", {}).items()
+            }
+        except Exception as e:
+            logger.warning(f"Load password hits `{self.file_path}` failed: {e}")
+
+        logger.debug(
+            f"Loaded {len(self._hits)} password hit records from `{self.file_path}`"
+        )
+
+    def rank(self, passwords: List[str], scope: Optional[str] = None) -> List[str]:
+        """
+        按命中次数排序密码
+
+        优先按分组内命中次数排序, 其次按全局命中次数排序
+
+        :param passwords: 密码列表
+        :param scope: 分组(例如: 所在目录, 文件名规则)
+        :return: 排序后的密码列表
+        """
+        with self._lock:
+            scope_hits = self._scope_hits.get(scope, {}) if scope is not None else {}
+            return sorted(
+                passwords,
+                key=lambda p: (-scope_hits.get(p, 0), -self._hits.get(p, 0)),
+            )
+
+    def hit(self, password: str, scope: Optional[str] = None):
+        """
+        记录密码命中
+
+        :param password: 密码
+        :param scope: 分组
+        """
+        with self._lock:
+            self._hits[password] = self._hits.get(password, 0) + 1
+            if scope is not None:
+                scope_hits = self._scope_hits.setdefault(scope, {})
+                scope_hits[password] = scope_hits.get(password, 0) + 1
+            self._changed = True
+
+    def save(self):
+        """
+        保存命中记录文件
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            data = {"hits": self._hits, "scope_hits": self._scope_hits}
+            write_file(self.file_path, json.dumps(data, ensure_ascii=False, indent=2))
+            self._changed = False
+
+        logger.debug(f"Password hits saved to `{self.file_path}`")
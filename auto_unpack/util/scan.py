@@ -0,0 +1,279 @@
+import fnmatch
+import logging
+import os
+import re
+from pathlib import Path, PurePath
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 递归匹配任意层目录的路径片段
+RECURSIVE_PART = "**"
+
+# 路径片段匹配函数
+Part_Match = Callable[[str], Optional[re.Match]]
+
+
+class _ScanState:
+    """
+    扫描状态(目录对应的包含规则匹配进度)
+    """
+
+    def __init__(
+        self,
+        parts: List[Tuple[Part_Match, int]],
+        recursive: Tuple[int, ...],
+        match_file: bool,
+        match_dir: bool,
+    ):
+        """
+        :param parts: 待匹配的路径片段 (匹配函数, 匹配后的位置)
+        :param recursive: 递归片段(**)的位置, 进入子目录后保持不变
+        :param match_file: 文件是否已匹配完整规则
+        :param match_dir: 文件夹是否已匹配完整规则
+        """
+        self.parts = parts
+        self.recursive = recursive
+        self.match_file = match_file
+        self.match_dir = match_dir
+
+    @property
+    def has_next(self) -> bool:
+        """
+        子目录中是否还可能有匹配的路径
+        """
+        return len(self.parts) > 0 or len(self.recursive) > 0
+
+
+class ScanMatcher:
+    """
+    扫描匹配器
+
+    包含规则(与 Path.glob 语义一致)按路径片段编译为状态机, 遍历目录时逐层推进,
+    一次遍历同时匹配所有规则, 不可能匹配的目录不再进入;
+    排除规则(与 path_glob_match 语义一致)合并为一个正则表达式,
+    以 * 结尾的排除规则匹配的文件夹(以 / 结尾)其下所有路径均被排除, 直接跳过
+    """
+
+    def __init__(self, includes: List[str], excludes: List[str], deep: bool = True):
+        """
+        :param includes: 包含规则(glob 语法, 相对扫描目录)
+        :param excludes: 排除规则(glob 语法)
+        :param deep: 是否递归扫描子目录(同 Path.rglob)
+        """
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        # 各位置的节点: 路径片段匹配函数 / 递归片段(RECURSIVE_PART)
+        # / 规则结束(值为是否仅匹配文件夹)
+        self._nodes: List[object] = []
+        starts = []
+        for include in includes:
+            parts = self._parse_include(include)
+            if deep:
+                parts = [RECURSIVE_PART] + parts
+            starts.append(len(self._nodes))
+            for part in parts:
+                if part == RECURSIVE_PART:
+                    self._nodes.append(RECURSIVE_PART)
+                else:
+                    self._nodes.append(re.compile(fnmatch.translate(part), flags).match)
+            self._nodes.append(parts[-1] == RECURSIVE_PART)
+
+        self._states: Dict[FrozenSet[int], _ScanState] = {}
+        self.start = self._get_state(frozenset(starts))
+
+        self._exclude = self._compile_excludes(excludes)
+        self._prune = self._compile_excludes([e for e in excludes if e.endswith("*")])
+
+    @staticmethod
+    def _parse_include(include: str) -> List[str]:
+        """
+        解析包含规则为路径片段
+
+        :param include: 包含规则
+        :return: 路径片段列表
+        """
+        path = PurePath(include)
+        if path.anchor:
+            raise ValueError(f"Non-relative include pattern `{include}` is unsupported")
+        parts = list(path.parts)
+        if len(parts) == 0:
+            raise ValueError(f"Unacceptable include pattern `{include}`")
+        for part in parts:
+            if RECURSIVE_PART in part and part != RECURSIVE_PART:
+                raise ValueError(
+                    f"Invalid include pattern `{include}`: "
+                    "`**` can only be an entire path component"
+                )
+        return parts
+
+    @staticmethod
+    def _compile_excludes(excludes: List[str]) -> Optional[Part_Match]:
+        """
+        合并排除规则为一个正则表达式
+
+        :param excludes: 排除规则
+        :return: 匹配函数, 无排除规则时为 None
+        """
+        if len(excludes) == 0:
+            return None
+        return re.compile("|".join(fnmatch.translate(e) for e in excludes)).match
+
+    def _get_state(self, positions: FrozenSet[int]) -> _ScanState:
+        """
+        获取扫描状态(相同位置集合的状态只创建一次)
+
+        :param positions: 各规则的匹配位置
+        :return: 扫描状态
+        """
+        state = self._states.get(positions, None)
+        if state is not None:
+            return state
+
+        # 递归片段可匹配零层目录, 同时处于其后的位置
+        closure = set()
+        stack = list(positions)
+        while len(stack) > 0:
+            position = stack.pop()
+            if position in closure:
+                continue
+            closure.add(position)
+            if self._nodes[position] is RECURSIVE_PART:
+                stack.append(position + 1)
+
+        parts = []
+        recursive = []
+        match_file = False
+        match_dir = False
+        for position in sorted(closure):
+            node = self._nodes[position]
+            if node is RECURSIVE_PART:
+                recursive.append(position)
+            elif isinstance(node, bool):
+                match_dir = True
+                match_file = match_file or not node
+            else:
+                parts.append((node, position + 1))
+
+        state = _ScanState(parts, tuple(recursive), match_file, match_dir)
+        self._states[positions] = state
+        return state
+
+    def step(
+        self, state: _ScanState, name: str, is_dir: bool, is_symlink: bool
+    ) -> Tuple[bool, Optional[_ScanState]]:
+        """
+        匹配目录下的路径
+
+        :param state: 所在目录的扫描状态
+        :param name: 路径名称
+        :param is_dir: 是否为文件夹
+        :param is_symlink: 是否为符号链接(递归片段不进入符号链接文件夹)
+        :return: (是否匹配包含规则, 子目录扫描状态(无需进入时为 None))
+        """
+        positions = [position for match, position in state.parts if match(name)]
+        if is_dir and not is_symlink:
+            positions.extend(state.recursive)
+        if len(positions) == 0:
+            return False, None
+
+        next_state = self._get_state(frozenset(positions))
+        matched = next_state.match_dir if is_dir else next_state.match_file
+        if is_dir and next_state.has_next:
+            return matched, next_state
+        return matched, None
+
+    def is_excluded(self, path: str, is_dir: bool) -> bool:
+        """
+        判断路径是否被排除
+
+        :param path: 路径
+        :param is_dir: 是否为文件夹(文件夹路径以 / 结尾)
+        :return: 是否被排除
+        """
+        if self._exclude is None:
+            return False
+        path = path.replace("\\", "/")
+        if is_dir and not path.endswith("/"):
+            path += "/"
+        return self._exclude(path) is not None
+
+    def is_pruned(self, path: str) -> bool:
+        """
+        判断文件夹及其下所有路径是否均被排除
+
+        :param path: 文件夹路径
+        :return: 是否跳过
+        """
+        if self._prune is None:
+            return False
+        path = path.replace("\\", "/")
+        if not path.endswith("/"):
+            path += "/"
+        return self._prune(path) is not None
+
+
+def scan_dir(
+    dir_path: Path,
+    includes: List[str],
+    excludes: List[str],
+    include_dir: bool = False,
+    deep: bool = True,
+) -> Iterator[Path]:
+    """
+    扫描目录
+
+    使用 os.scandir 只遍历一次目录树(复用目录项缓存的文件类型, 无需额外 stat),
+    同一路径匹配多个包含规则时只返回一次
+
+    :param dir_path: 扫描目录
+    :param includes: 包含规则(glob 语法, 相对扫描目录)
+    :param excludes: 排除规则(glob 语法)
+    :param include_dir: 是否包含文件夹
+    :param deep: 是否递归扫描子目录
+    :return: 路径迭代器(按目录深度优先的顺序)
+    """
+    matcher = ScanMatcher(includes, excludes, deep)
+    if not dir_path.is_dir():
+        return
+
+    root = str(dir_path)
+    if matcher.is_pruned(root):
+        return
+    if include_dir and matcher.start.match_dir and not matcher.is_excluded(root, True):
+        yield dir_path
+
+    stack = [(root, matcher.start)]
+    while len(stack) > 0:
+        current, state = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.warning(f"Scan directory `{current}` failed: {e}")
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            matched, sub_state = matcher.step(
+                state, entry.name, is_dir, entry.is_symlink()
+            )
+            if not matched and sub_state is None:
+                continue
+
+            path = entry.name if current == "." else entry.path
+            if is_dir and matcher.is_pruned(path):
+                continue
+            if (
+                matched
+                and (include_dir or entry.is_file())
+                and not matcher.is_excluded(path, is_dir)
+            ):
+                yield Path(path)
+            if sub_state is not None:
+                sub_dirs.append((path, sub_state))
+
+        stack.extend(reversed(sub_dirs))
@@ -1,10 +1,19 @@
 import logging
 import platform
 from pathlib import Path
-from typing import List, TypeVar
-
-from ..exec import exec_cmd
-from .result import ExtractResult, ListResult, Result, ResultCode, TestResult
+from typing import Iterator, List, Optional, TypeVar
+
+from ..exec import CancelToken, CmdLines, exec_cmd
+from .result import (
+    ExtractResult,
+    FileEntry,
+    ListResult,
+    ListStream,
+    Result,
+    ResultCode,
+    TechnicalParser,
+    TestResult,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +101,38 @@ class SevenZipUtil:
 
         return result_code
 
+    @classmethod
+    def _cmds(
+        cls, sub: str, options: List[str], file_path: Path, password: str = ""
+    ) -> List[str]:
+        """
+        生成 7zip 命令参数列表
+
+        :param sub: 子命令
+        :param options: 命令选项
+        :param file_path: 压缩包路径
+        :param password: 密码
+        :return: 命令参数列表
+        """
+        return [
+            str(cls._lib_path),
+            sub,
+            str(file_path),
+            f"-p{password}",
+            "-y",
+            *options,
+        ]
+
+    @classmethod
+    def _thread_options(cls, threads: Optional[int]) -> List[str]:
+        """
+        生成线程数选项
+
+        :param threads: 线程数(null: 由 7-zip 自行决定)
+        :return: 命令选项
+        """
+        return [] if threads is None else [f"-mmt{threads}"]
+
     @classmethod
     def exec(
         cls,
@@ -100,6 +141,7 @@ class SevenZipUtil:
         file_path: Path,
         password: str = "",
         result_class: T = Result,
+        cancel_token: Optional[CancelToken] = None,
     ) -> T:
         """
         执行 7zip 命令
@@ -109,17 +151,11 @@ class SevenZipUtil:
         :param file_path: 压缩包路径
         :param password: 密码
         :param result_class: 结果类
+        :param cancel_token: 取消令牌
         :return: 结果
         """
-        cmds = [
-            f'"{str(cls._lib_path)}"',
-            sub,
-            f'"{file_path}"',
-            f'-p"{password}"',
-            "-y",
-            *options,
-        ]
-        code, message = exec_cmd(cmds)
+        cmds = cls._cmds(sub, options, file_path, password)
+        code, message = exec_cmd(cmds, cancel_token=cancel_token)
         result_code = cls.handle_result_code(code, message)
         return result_class(
             message=message, file_path=file_path, password=password, code=result_code
@@ -133,6 +169,8 @@ class SevenZipUtil:
         output_dir: Path = "",
         overwrite: str = "t",
         keep_dir: bool = True,
+        cancel_token: Optional[CancelToken] = None,
+        threads: Optional[int] = None,
     ) -> ExtractResult:
         """
         解压 7zip 压缩包
@@ -142,33 +180,98 @@ class SevenZipUtil:
         :param output_dir: 输出目录
         :param overwrite: 覆盖模式 a/s/t/u
         :param keep_dir: 是否保留目录结构
+        :param cancel_token: 取消令牌
+        :param threads: 7-zip 线程数(-mmt, null: 由 7-zip 自行决定)
         :return: 解压结果
         """
         sub = "x" if keep_dir else "e"
         options = [
             f"-ao{overwrite}",
-            f'-o"{output_dir}"',
+            f"-o{output_dir}",
+            *cls._thread_options(threads),
         ]
-        return cls.exec(sub, options, file_path, password, ExtractResult)
+        return cls.exec(sub, options, file_path, password, ExtractResult, cancel_token)
 
     @classmethod
-    def list(cls, file_path: Path, password: str = "") -> ListResult:
+    def list(
+        cls,
+        file_path: Path,
+        password: str = "",
+        technical: bool = False,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> ListResult:
         """
         列出 7zip 压缩包信息
 
         :param file_path: 压缩包路径
         :param password: 密码
+        :param technical: 是否输出技术信息(-slt, 包含文件是否加密等信息)
+        :param cancel_token: 取消令牌
         :return: 压缩包信息
         """
-        return cls.exec("l", [], file_path, password, ListResult)
+        options = ["-slt"] if technical else []
+        return cls.exec("l", options, file_path, password, ListResult, cancel_token)
+
+    @classmethod
+    def iter_list(
+        cls,
+        file_path: Path,
+        password: str = "",
+        cancel_token: Optional[CancelToken] = None,
+    ) -> ListStream:
+        """
+        流式列出 7zip 压缩包文件
+
+        使用技术信息格式(-slt)逐行解析 7-zip 输出, 不缓存完整输出
+
+        :param file_path: 压缩包路径
+        :param password: 密码
+        :param cancel_token: 取消令牌
+        :return: 流式文件列表(迭代结束后可获取状态码)
+        """
+        stream = ListStream(file_path, password)
+        cmds = cls._cmds("l", ["-slt"], file_path, password)
+
+        def entries() -> Iterator[FileEntry]:
+            lines = CmdLines(cmds, cancel_token=cancel_token)
+            parser = TechnicalParser()
+            try:
+                for line in lines:
+                    entry = parser.feed(line)
+                    if entry is not None:
+                        yield entry
+                entry = parser.close()
+                if entry is not None:
+                    yield entry
+            finally:
+                # 提前结束迭代时 CmdLines 已结束进程并设置取消状态码
+                message = "\n".join(parser.messages)
+                stream.code = cls.handle_result_code(lines.code, message)
+
+        stream.entries = entries()
+        return stream
 
     @classmethod
-    def test(cls, file_path: Path, password: str = "") -> TestResult:
+    def test(
+        cls,
+        file_path: Path,
+        password: str = "",
+        includes: Optional[List[Path]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        threads: Optional[int] = None,
+    ) -> TestResult:
         """
         测试 7zip 压缩包是否完整
 
         :param file_path: 压缩包路径
         :param password: 密码
+        :param includes: 仅测试压缩包内的指定文件(null: 测试全部文件)
+        :param cancel_token: 取消令牌
+        :param threads: 7-zip 线程数(-mmt, null: 由 7-zip 自行决定)
         :return: 测试结果
         """
-        return cls.exec("t", [], file_path, password, ListResult)
+        options = cls._thread_options(threads)
+        if includes:
+            # 关闭通配符匹配, 按文件名精确匹配
+            options += ["-spd", *[str(include) for include in includes]]
+        return cls.exec("t", options, file_path, password, ListResult, cancel_token)
@@ -0,0 +1,546 @@
+import logging
+import os
+import re
+import tarfile
+import zipfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Set, Union
+
+from ..exec import CANCELLED_CODE, CancelToken
+from . import SevenZipUtil
+from .result import (
+    Attr,
+    ExtractResult,
+    FileEntry,
+    FileInfo,
+    ListResult,
+    ListStream,
+    Result,
+    ResultCode,
+    TestResult,
+)
+
+logger = logging.getLogger(__name__)
+
+Archive = Union[zipfile.ZipFile, tarfile.TarFile]
+
+# 内置库处理失败时的异常(压缩包损坏, 格式不支持等)
+ARCHIVE_ERRORS = (
+    zipfile.BadZipFile,
+    tarfile.TarError,
+    RuntimeError,
+    EOFError,
+    zlib.error,
+    OSError,
+    ValueError,
+    NotImplementedError,
+)
+
+# 分卷文件名(.001 .01 之类为后缀)
+VOLUME_NAME_PATTERN = r"\.\d+$"
+
+# 内置库支持的 zip 压缩算法
+SUPPORTED_ZIP_COMPRESS_TYPES = (
+    zipfile.ZIP_STORED,
+    zipfile.ZIP_DEFLATED,
+    zipfile.ZIP_BZIP2,
+    zipfile.ZIP_LZMA,
+)
+
+# 修改时间格式(与 7-zip 输出一致)
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 读取数据块大小
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class BuiltinSevenZipUtil(SevenZipUtil):
+    """
+    内置库 7zip 工具类
+
+    zip/tar 压缩包使用 Python 内置库在进程内处理, 无需启动 7-zip 进程;
+    其他格式以及内置库不支持的情况(分卷, 加密, 压缩的 tar 等)回退至 7-zip 命令行,
+    内置库处理出错(格式解析失败等)时同样回退, 仅 CRC 校验失败, 密码错误直接返回失败
+    """
+
+    @classmethod
+    def _open(cls, file_path: Path) -> Optional[Archive]:
+        """
+        使用内置库打开压缩包
+
+        :param file_path: 压缩包路径
+        :return: 压缩包, 内置库不支持时返回 None
+        """
+        # 内置库只能读取单个分卷, 分卷压缩包交由 7-zip
+        name = file_path.name.lower()
+        if re.search(VOLUME_NAME_PATTERN, name):
+            return None
+        if name.endswith(".zip") and file_path.with_suffix(".z01").exists():
+            return None
+
+        try:
+            if zipfile.is_zipfile(file_path):
+                archive = zipfile.ZipFile(file_path)
+                if all(cls._is_supported_zip_info(i) for i in archive.infolist()):
+                    return archive
+                archive.close()
+                return None
+            # 仅处理未压缩的 tar, 压缩的 tar 与 7-zip 行为一致(先解出 .tar 文件)
+            if tarfile.is_tarfile(file_path):
+                archive = tarfile.open(file_path, "r:")
+                try:
+                    # 预先读取全部文件头, 不完整的 tar 在此处失败
+                    archive.getmembers()
+                except ARCHIVE_ERRORS:
+                    archive.close()
+                    raise
+                return archive
+        except ARCHIVE_ERRORS as e:
+            logger.debug(f"Builtin open `{file_path}` failed, fallback to 7-zip: {e}")
+        return None
+
+    @classmethod
+    def _is_supported_zip_info(cls, info: zipfile.ZipInfo) -> bool:
+        """
+        内置库是否支持处理该 zip 文件(压缩算法, 未加密)
+
+        内置库不支持 AES 加密, ZipCrypto 为纯 Python 解密, 远慢于 7-zip
+
+        :param info: zip 文件信息
+        :return: 是否支持
+        """
+        # 0x1: 加密
+        return info.compress_type in SUPPORTED_ZIP_COMPRESS_TYPES and not (
+            info.flag_bits & 0x1
+        )
+
+    @classmethod
+    def _is_data_error(cls, error: Exception) -> bool:
+        """
+        是否为压缩包数据错误(CRC 校验失败, 密码错误), 其他错误回退至 7-zip
+
+        :param error: 异常
+        :return: 是否为数据错误
+        """
+        message = str(error)
+        if isinstance(error, zipfile.BadZipFile):
+            return message.startswith("Bad CRC-32")
+        if isinstance(error, RuntimeError):
+            return message.startswith("Bad password")
+        return False
+
+    @classmethod
+    def _attr(cls, archive: Archive, file_path: Path) -> Attr:
+        """
+        获取压缩包属性
+
+        :param archive: 压缩包
+        :param file_path: 压缩包路径
+        :return: 压缩包属性
+        """
+        archive_type = "zip" if isinstance(archive, zipfile.ZipFile) else "tar"
+        return Attr(type=archive_type, physical_size=str(file_path.stat().st_size))
+
+    @classmethod
+    def _entries(cls, archive: Archive) -> Iterator[FileEntry]:
+        """
+        遍历压缩包内文件
+
+        :param archive: 压缩包
+        :return: 文件信息迭代器
+        """
+        if isinstance(archive, zipfile.ZipFile):
+            for info in archive.infolist():
+                try:
+                    date_time = datetime(*info.date_time).strftime(TIME_FORMAT)
+                except ValueError:
+                    date_time = None
+                yield FileEntry(
+                    path=Path(info.filename),
+                    attr="D" if info.is_dir() else "A",
+                    size=info.file_size,
+                    compressed=info.compress_size,
+                    date_time=date_time,
+                    encrypted=bool(info.flag_bits & 0x1),
+                )
+        else:
+            for info in archive.getmembers():
+                try:
+                    date_time = datetime.fromtimestamp(info.mtime).strftime(TIME_FORMAT)
+                except (ValueError, OverflowError, OSError):
+                    date_time = None
+                yield FileEntry(
+                    path=Path(info.name),
+                    attr="D" if info.isdir() else "A",
+                    size=info.size,
+                    compressed=info.size,
+                    date_time=date_time,
+                    encrypted=False,
+                )
+
+    @classmethod
+    def _files(cls, archive: Archive) -> List[FileInfo]:
+        """
+        获取压缩包内文件列表
+
+        :param archive: 压缩包
+        :return: 文件列表
+        """
+        return [FileInfo.from_entry(entry) for entry in cls._entries(archive)]
+
+    @classmethod
+    def _copy_member(
+        cls,
+        src: IO[bytes],
+        dst: Optional[IO[bytes]],
+        cancel_token: Optional[CancelToken],
+    ) -> bool:
+        """
+        按数据块复制压缩包内文件数据(数据块之间检查取消)
+
+        :param src: 压缩包内文件
+        :param dst: 目标文件(为 None 时仅读取, 校验 CRC)
+        :param cancel_token: 取消令牌
+        :return: 是否完成(被取消时返回 False)
+        """
+        while True:
+            if cancel_token is not None and cancel_token.cancelled:
+                return False
+            data = src.read(READ_BLOCK_SIZE)
+            if not data:
+                return True
+            if dst is not None:
+                dst.write(data)
+
+    @classmethod
+    def _read_members(
+        cls,
+        archive: Archive,
+        includes: Optional[List[Path]],
+        cancel_token: Optional[CancelToken],
+    ) -> int:
+        """
+        读取压缩包内所有文件数据(校验 CRC)
+
+        :param archive: 压缩包
+        :param includes: 仅读取的文件
+        :param cancel_token: 取消令牌
+        :return: 读取的文件数
+        """
+        include_names = None if not includes else {str(i) for i in includes}
+        count = 0
+
+        if isinstance(archive, zipfile.ZipFile):
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if include_names is not None and info.filename not in include_names:
+                    continue
+                with archive.open(info) as f:
+                    if not cls._copy_member(f, None, cancel_token):
+                        return count
+                count += 1
+        else:
+            for info in archive.getmembers():
+                if not info.isfile():
+                    continue
+                if include_names is not None and info.name not in include_names:
+                    continue
+                if not cls._copy_member(archive.extractfile(info), None, cancel_token):
+                    return count
+                count += 1
+
+        return count
+
+    @classmethod
+    def _is_safe(cls, archive: Archive) -> bool:
+        """
+        压缩包是否可以安全解压(不包含链接, 设备文件, 绝对路径, 上级目录)
+
+        :param archive: 压缩包
+        :return: 是否安全
+        """
+        if isinstance(archive, zipfile.ZipFile):
+            names = archive.namelist()
+        else:
+            if not all(i.isfile() or i.isdir() for i in archive.getmembers()):
+                return False
+            names = archive.getnames()
+        for name in names:
+            path = Path(name.replace("\\", "/"))
+            if path.is_absolute() or path.drive or ".." in path.parts:
+                return False
+        return True
+
+    @classmethod
+    def _extract_members(
+        cls,
+        archive: Archive,
+        output_dir: Path,
+        cancel_token: Optional[CancelToken],
+        created: List[Path],
+    ) -> bool:
+        """
+        逐个解压压缩包内文件(数据块之间检查取消)
+
+        :param archive: 压缩包
+        :param output_dir: 输出目录
+        :param cancel_token: 取消令牌
+        :param created: 已创建的文件/文件夹(用于回退至 7-zip 前清理)
+        :return: 是否完成(被取消时返回 False)
+        """
+        known_dirs: Set[Path] = set()
+
+        def make_dirs(dir_path: Path):
+            missing = []
+            while dir_path not in known_dirs and not dir_path.is_dir():
+                missing.append(dir_path)
+                dir_path = dir_path.parent
+            for path in reversed(missing):
+                path.mkdir()
+                created.append(path)
+                known_dirs.add(path)
+            known_dirs.add(dir_path)
+
+        if isinstance(archive, zipfile.ZipFile):
+            members = [(i.filename, i.is_dir(), i) for i in archive.infolist()]
+        else:
+            members = [(i.name, i.isdir(), i) for i in archive.getmembers()]
+
+        for name, is_dir, info in members:
+            target = output_dir / name
+            if is_dir:
+                make_dirs(target)
+                continue
+
+            make_dirs(target.parent)
+            if isinstance(archive, zipfile.ZipFile):
+                src = archive.open(info)
+            else:
+                src = archive.extractfile(info)
+            with src, open(target, "wb") as dst:
+                created.append(target)
+                if not cls._copy_member(src, dst, cancel_token):
+                    return False
+
+            if isinstance(info, tarfile.TarInfo):
+                # 与 tarfile.extractall 一致, 保留权限与修改时间
+                os.chmod(target, info.mode)
+                os.utime(target, (info.mtime, info.mtime))
+
+        return True
+
+    @classmethod
+    def _remove_created(cls, created: List[Path]):
+        """
+        删除已创建的文件/文件夹
+
+        :param created: 已创建的文件/文件夹(按创建顺序)
+        """
+        for path in reversed(created):
+            try:
+                if path.is_dir():
+                    path.rmdir()
+                else:
+                    path.unlink()
+            except OSError:
+                pass
+
+    @classmethod
+    def _fail(
+        cls,
+        result_class,
+        file_path: Path,
+        password: str,
+        error: Exception,
+    ) -> Result:
+        """
+        生成失败结果
+
+        :param result_class: 结果类
+        :param file_path: 压缩包路径
+        :param password: 密码
+        :param error: 异常
+        :return: 结果
+        """
+        return result_class(
+            message=f"ERROR: {error}",
+            file_path=file_path,
+            password=password,
+            code=ResultCode.FATAL_ERROR,
+        )
+
+    @classmethod
+    def _cancelled(cls, result_class, file_path: Path, password: str) -> Result:
+        """
+        生成取消结果
+        """
+        return result_class(
+            message="",
+            file_path=file_path,
+            password=password,
+            code=ResultCode.init(CANCELLED_CODE),
+        )
+
+    @classmethod
+    def list(
+        cls,
+        file_path: Path,
+        password: str = "",
+        technical: bool = False,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> ListResult:
+        if cancel_token is not None and cancel_token.cancelled:
+            return cls._cancelled(ListResult, file_path, password)
+
+        archive = cls._open(file_path)
+        if archive is None:
+            return super().list(file_path, password, technical, cancel_token)
+
+        try:
+            with archive:
+                return ListResult(
+                    message="",
+                    file_path=file_path,
+                    password=password,
+                    code=ResultCode.NO_ERROR,
+                    attr=cls._attr(archive, file_path),
+                    files=cls._files(archive),
+                )
+        except ARCHIVE_ERRORS as e:
+            if cls._is_data_error(e):
+                return cls._fail(ListResult, file_path, password, e)
+            logger.debug(f"Builtin list `{file_path}` failed, fallback to 7-zip: {e}")
+            return super().list(file_path, password, technical, cancel_token)
+
+    @classmethod
+    def iter_list(
+        cls,
+        file_path: Path,
+        password: str = "",
+        cancel_token: Optional[CancelToken] = None,
+    ) -> ListStream:
+        archive = cls._open(file_path)
+        if archive is None:
+            return super().iter_list(file_path, password, cancel_token)
+
+        stream = ListStream(file_path, password)
+
+        def entries() -> Iterator[FileEntry]:
+            with archive:
+                for entry in cls._entries(archive):
+                    if cancel_token is not None and cancel_token.cancelled:
+                        stream.code = ResultCode.init(CANCELLED_CODE)
+                        return
+                    yield entry
+            stream.code = ResultCode.NO_ERROR
+
+        stream.entries = entries()
+        return stream
+
+    @classmethod
+    def test(
+        cls,
+        file_path: Path,
+        password: str = "",
+        includes: Optional[List[Path]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        threads: Optional[int] = None,
+    ) -> TestResult:
+        if cancel_token is not None and cancel_token.cancelled:
+            return cls._cancelled(TestResult, file_path, password)
+
+        archive = cls._open(file_path)
+        if archive is None:
+            return super().test(file_path, password, includes, cancel_token, threads)
+
+        try:
+            with archive:
+                attr = cls._attr(archive, file_path)
+                count = cls._read_members(archive, includes, cancel_token)
+        except ARCHIVE_ERRORS as e:
+            if cls._is_data_error(e):
+                return cls._fail(TestResult, file_path, password, e)
+            logger.debug(f"Builtin test `{file_path}` failed, fallback to 7-zip: {e}")
+            return super().test(file_path, password, includes, cancel_token, threads)
+
+        if cancel_token is not None and cancel_token.cancelled:
+            return cls._cancelled(TestResult, file_path, password)
+
+        return TestResult(
+            message=f"Files: {count}",
+            file_path=file_path,
+            password=password,
+            code=ResultCode.NO_ERROR,
+            attr=attr,
+        )
+
+    @classmethod
+    def extract(
+        cls,
+        file_path: Path,
+        password: str = "",
+        output_dir: Path = "",
+        overwrite: str = "t",
+        keep_dir: bool = True,
+        cancel_token: Optional[CancelToken] = None,
+        threads: Optional[int] = None,
+    ) -> ExtractResult:
+        if cancel_token is not None and cancel_token.cancelled:
+            return cls._cancelled(ExtractResult, file_path, password)
+
+        archive = None
+        if keep_dir:
+            # 不保留目录结构时, 同名文件的处理交由 7-zip
+            archive = cls._open(file_path)
+        if archive is not None and not cls._is_safe(archive):
+            archive.close()
+            archive = None
+        if archive is None:
+            return super().extract(
+                file_path,
+                password,
+                output_dir,
+                overwrite,
+                keep_dir,
+                cancel_token,
+                threads,
+            )
+
+        created: List[Path] = []
+        try:
+            with archive:
+                attr = cls._attr(archive, file_path)
+                completed = cls._extract_members(
+                    archive, Path(output_dir), cancel_token, created
+                )
+        except ARCHIVE_ERRORS as e:
+            if cls._is_data_error(e):
+                return cls._fail(ExtractResult, file_path, password, e)
+            logger.debug(
+                f"Builtin extract `{file_path}` failed, fallback to 7-zip: {e}"
+            )
+            # 清理已解压的文件, 避免 7-zip 重命名已存在的文件
+            cls._remove_created(created)
+            return super().extract(
+                file_path,
+                password,
+                output_dir,
+                overwrite,
+                keep_dir,
+                cancel_token,
+                threads,
+            )
+
+        if not completed:
+            return cls._cancelled(ExtractResult, file_path, password)
+
+        return ExtractResult(
+            message="Everything is Ok",
+            file_path=file_path,
+            password=password,
+            code=ResultCode.NO_ERROR,
+            attr=attr,
+        )
@@ -2,9 +2,44 @@ import os
 import re
 from enum import Enum
 from pathlib import Path
-from typing import Callable, List, Literal, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, PrivateAttr, computed_field
+
+from ..file import DirIndex
+
+# 技术信息(-slt)格式中文件信息块的分割线
+TECHNICAL_SEPARATOR_PATTERN = r"^-{10}$"
+
+
+def get_volume_family(name: str) -> str:
+    """
+    获取文件名所属的分卷族
+
+    与 ListResult.volume_paths 的分卷命名规则对应(宁可多归并, 不可拆分),
+    同一分卷压缩包的所有分卷必定属于同一分卷族, 不同分卷族可以独立识别
+
+    :param name: 文件名
+    :return: 分卷族名称
+    """
+    name = name.lower()
+
+    # .001 .01 之类为后缀的分卷
+    match = re.match(r"(.+)\.\d+$", name)
+    if match:
+        return match.group(1)
+
+    # .zip .z01 之类为后缀的分卷
+    match = re.match(r"(.+)\.(?:zip|z\d+)$", name)
+    if match:
+        return f"{match.group(1)}.zip"
+
+    # .part1.rar 之类为后缀的分卷
+    match = re.match(r"(.+)\.part\d+\.rar$", name)
+    if match:
+        return f"{match.group(1)}.part.rar"
+
+    return name
 
 
 class ResultCode(Enum):
@@ -70,6 +105,8 @@ class Attr(BaseModel):
 class Result(BaseModel):
     """
     7zip 命令行结果
+
+    压缩包信息(attr, is_volume)在首次访问时才从命令行输出中解析, 并缓存解析结果
     """
 
     # 命令行输出结果
@@ -81,55 +118,87 @@ class Result(BaseModel):
     # 状态码
     code: ResultCode
 
+    # 压缩包信息(None: 尚未解析)
+    _attr: Optional[Attr] = PrivateAttr(None)
     # 是否是分卷压缩包
-    is_volume: bool = False
+    _is_volume: bool = PrivateAttr(False)
 
-    # 压缩包信息
-    attr: Attr = Attr()
+    def __init__(self, attr: Optional[Attr] = None, is_volume: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        if attr is not None:
+            # 直接传入压缩包信息时无需解析
+            self._is_volume = is_volume
+            self._attr = attr
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # 解析压缩包信息
-        self._parse_infos()
+    @computed_field
+    @property
+    def attr(self) -> Attr:
+        """
+        压缩包信息
+        """
+        if self._attr is None:
+            self._parse_infos()
+        return self._attr
 
-    def _update_info(self, key: str, value: str):
+    @computed_field
+    @property
+    def is_volume(self) -> bool:
+        """
+        是否是分卷压缩包
+        """
+        if self._attr is None:
+            self._parse_infos()
+        return self._is_volume
+
+    def _update_info(self, attr: Attr, key: str, value: str) -> bool:
         """
         更新压缩包信息
 
+        :param attr: 压缩包信息
         :param key: 参数名称
         :param value: 参数值
+        :return: 是否是分卷压缩包
         """
         format_value: any = value
+        is_volume = False
 
         if key == "type":
             if value.lower() == "split":
-                self.is_volume = True
-                return
+                return True
 
         elif key == "multivolume":
             format_value = value == "+"
-            if format_value:
-                self.is_volume = True
+            is_volume = format_value
 
         elif key == "volumes":
             format_value = int(value)
-            if format_value > 1:
-                self.is_volume = True
+            is_volume = format_value > 1
 
         elif key == "volume_index":
             format_value = int(value)
-            self.is_volume = True
+            is_volume = True
 
-        setattr(self.attr, key, format_value)
+        setattr(attr, key, format_value)
+        return is_volume
 
     def _parse_infos(self):
         """
         解析压缩包信息
         """
+        # 技术信息格式下, 分割线后为文件信息, 不属于压缩包信息
+        message = re.split(TECHNICAL_SEPARATOR_PATTERN, self.message, 1, re.M)[0]
         pattern = r"^([a-zA-Z ]+)\s+=\s+(.+)"
-        groups: List[Tuple[str, str]] = re.findall(pattern, self.message, re.M)
+        groups: List[Tuple[str, str]] = re.findall(pattern, message, re.M)
+
+        attr = Attr()
+        is_volume = False
         for key, value in groups:
-            self._update_info(key.replace(" ", "_").lower(), value.strip())
+            if self._update_info(attr, key.replace(" ", "_").lower(), value.strip()):
+                is_volume = True
+
+        # 先设置 _is_volume, _attr 不为 None 即表示解析完成
+        self._is_volume = is_volume
+        self._attr = attr
 
 
 class ExtractResult(Result):
@@ -140,6 +209,42 @@ class ExtractResult(Result):
     pass
 
 
+class FileEntry:
+    """
+    压缩包内文件信息(流式列出使用)
+
+    使用 __slots__ 减少内存占用, 字段同 FileInfo
+    """
+
+    __slots__ = ("path", "attr", "size", "compressed", "date_time", "encrypted")
+
+    def __init__(
+        self,
+        path: Path,
+        attr: str,
+        size: Optional[int] = None,
+        compressed: Optional[int] = None,
+        date_time: Optional[str] = None,
+        encrypted: Optional[bool] = None,
+    ):
+        self.path = path
+        self.attr = attr
+        self.size = size
+        self.compressed = compressed
+        self.date_time = date_time
+        self.encrypted = encrypted
+
+    @property
+    def is_dir(self) -> bool:
+        """
+        是否是文件夹
+        """
+        return self.attr == "D"
+
+    def __repr__(self) -> str:
+        return f"FileEntry(path={self.path!r}, attr={self.attr!r}, size={self.size})"
+
+
 class FileInfo(BaseModel):
     """
     压缩包内文件信息
@@ -151,6 +256,8 @@ class FileInfo(BaseModel):
     size: Optional[int] = None
     compressed: Optional[int] = None
     path: Path
+    # 是否加密(仅技术信息格式可用)
+    encrypted: Optional[bool] = None
 
     @property
     def is_dir(self) -> bool:
@@ -159,10 +266,149 @@ class FileInfo(BaseModel):
         """
         return self.attr == "D"
 
+    @classmethod
+    def from_entry(cls, entry: FileEntry) -> "FileInfo":
+        """
+        由流式文件信息生成文件信息
+
+        :param entry: 流式文件信息
+        :return: 文件信息
+        """
+        return cls(
+            date_time=entry.date_time,
+            attr=entry.attr,
+            size=entry.size,
+            compressed=entry.compressed,
+            path=entry.path,
+            encrypted=entry.encrypted,
+        )
+
+
+class TechnicalParser:
+    """
+    技术信息格式(-slt)增量解析器
+
+    逐行输入 7-zip 输出, 每读完一个文件信息块返回一个 FileEntry;
+    首个分割线前为压缩包信息, 保存在 infos 中, 分割线后为以空行分隔的文件信息块
+    """
+
+    def __init__(self):
+        # 压缩包信息
+        self.infos: Dict[str, str] = {}
+        # 非键值对的输出行(错误信息等)
+        self.messages: List[str] = []
+        # 是否已进入文件信息部分(分割线后)
+        self._in_files = False
+        # 当前文件信息块
+        self._block: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[FileEntry]:
+        """
+        输入一行输出
+
+        :param line: 输出行(不含换行符)
+        :return: 读完一个文件信息块时返回文件信息, 否则返回 None
+        """
+        if not self._in_files and re.match(TECHNICAL_SEPARATOR_PATTERN, line):
+            self._in_files = True
+            return None
+
+        if line.strip() == "":
+            return self.close() if self._in_files else None
+
+        key, sep, value = line.partition(" = ")
+        if sep == "":
+            if not line.endswith(" ="):
+                self.messages.append(line)
+                return None
+            key, value = line[:-2], ""
+
+        if self._in_files:
+            self._block[key.strip()] = value.strip()
+        else:
+            self.infos[key.strip()] = value.strip()
+        return None
+
+    def close(self) -> Optional[FileEntry]:
+        """
+        结束输入
+
+        :return: 最后一个未返回的文件信息, 不存在时返回 None
+        """
+        block, self._block = self._block, {}
+        if block.get("Path", "") == "":
+            return None
+
+        attributes = block.get("Attributes", "")
+        if block.get("Folder", "") == "+" or attributes.startswith("D"):
+            attr = "D"
+        else:
+            attr = "A"
+
+        s = block.get("Size", "")
+        c = block.get("Packed Size", "")
+        d = block.get("Modified", "")
+        e = block.get("Encrypted", "")
+
+        return FileEntry(
+            path=Path(block["Path"]),
+            attr=attr,
+            size=int(s) if s.isdigit() else None,
+            compressed=int(c) if c.isdigit() else None,
+            date_time=None if d == "" else d,
+            encrypted=None if e == "" else e == "+",
+        )
+
+
+class ListStream:
+    """
+    流式压缩包文件列表
+
+    迭代时边读取边返回文件信息, 内存占用与单个文件信息成正比;
+    迭代结束后可通过 code 获取状态码
+    """
+
+    def __init__(self, file_path: Path, password: str):
+        # 传入路径
+        self.file_path = file_path
+        # 传入密码
+        self.password = password
+        # 状态码(迭代结束后可用)
+        self.code: ResultCode = ResultCode.UNKNOWN
+        # 文件信息迭代器(由 SevenZipUtil 设置)
+        self.entries: Iterator[FileEntry] = iter(())
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        return self.entries
+
 
 class ListResult(Result):
-    # 文件列表
-    files: List[FileInfo] = []
+    """
+    7zip 列表结果
+
+    文件列表在首次访问时才从命令行输出中解析, 并缓存解析结果
+    """
+
+    # 文件列表(None: 尚未解析)
+    _files: Optional[List[FileInfo]] = PrivateAttr(None)
+    # 分卷文件路径(None: 尚未查找)
+    _volume_paths: Optional[List[Path]] = PrivateAttr(None)
+
+    def __init__(self, files: Optional[List[FileInfo]] = None, **kwargs):
+        super().__init__(**kwargs)
+        if files is not None:
+            # 直接传入文件列表时无需解析
+            self._files = files
+
+    @computed_field
+    @property
+    def files(self) -> List[FileInfo]:
+        """
+        文件列表
+        """
+        if self._files is None:
+            self._parse_files()
+        return self._files
 
     @property
     def volume_main_path(self) -> Path:
@@ -177,9 +423,36 @@ class ListResult(Result):
         """
         所有分卷文件路径
         """
+        return self.find_volume_paths()
+
+    def find_volume_paths(self, dir_index: Optional[DirIndex] = None) -> List[Path]:
+        """
+        查找所有分卷文件路径
+
+        查找结果会被缓存, 之后访问 volume_paths 不再查找
+
+        :param dir_index: 目录文件索引(None: 直接访问文件系统)
+        :return: 所有分卷文件路径
+        """
+        if self._volume_paths is None:
+            self._volume_paths = self._find_volume_paths(dir_index)
+        return self._volume_paths
+
+    def _find_volume_paths(self, dir_index: Optional[DirIndex]) -> List[Path]:
+        """
+        查找所有分卷文件路径
+
+        :param dir_index: 目录文件索引(None: 直接访问文件系统)
+        :return: 所有分卷文件路径
+        """
         if not self.is_volume:
             return [self.file_path]
 
+        if dir_index is None:
+            exists = Path.exists
+        else:
+            exists = dir_index.exists
+
         # 文件名不含后缀
         stem = self.file_path.stem
         name = self.file_path.name
@@ -198,7 +471,7 @@ class ListResult(Result):
             index = 1
             while True:
                 volume_path = parent / name_callback(index)
-                if not volume_path.exists():
+                if not exists(volume_path):
                     break
                 paths.append(volume_path)
                 index += 1
@@ -230,12 +503,36 @@ class ListResult(Result):
         if len(volume_paths) == 0:
             volume_paths.append(self.file_path)
 
-        return [p for p in volume_paths if p.exists()]
+        return [p for p in volume_paths if exists(p)]
+
+    def _parse_technical_files(self):
+        """
+        解析技术信息格式(-slt)的压缩包文件列表
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # 解析文件列表
-        self._parse_files()
+        大致格式如下:
+
+        ```txt
+        ----------
+        Path = image\a.svg
+        Folder = -
+        Size = 56792
+        Packed Size = 201084528
+        Modified = 2022-11-11 01:04:14
+        Attributes = A
+        Encrypted = +
+
+        Path = image
+        Folder = +
+        ...
+        ```
+        """
+        files: List[FileInfo] = []
+        parser = TechnicalParser()
+        entries = (parser.feed(line) for line in self.message.splitlines())
+        for entry in [*entries, parser.close()]:
+            if entry is not None:
+                files.append(FileInfo.from_entry(entry))
+        self._files = files
 
     def _parse_files(self):
         """
@@ -251,10 +548,16 @@ class ListResult(Result):
         ------------------- ----- ------------ ------------  ------------------------
         ```
         """
+        if re.search(TECHNICAL_SEPARATOR_PATTERN, self.message, re.M):
+            self._parse_technical_files()
+            return
+
+        files: List[FileInfo] = []
         pattern = r"((?:(?:-+\s+){4})+(?:-+))([\s\S]+?)(?:(?:-+\s+){5})+"
         groups: List[Tuple[str, str]] = re.findall(pattern, self.message, re.M)
 
         if len(groups) == 0:
+            self._files = files
             return
 
         # 获取列开始位置
@@ -293,7 +596,9 @@ class ListResult(Result):
                 compressed=compressed,
                 path=Path(name),
             )
-            self.files.append(file)
+            files.append(file)
+
+        self._files = files
 
 
 class TestResult(Result):
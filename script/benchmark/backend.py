@@ -0,0 +1,77 @@
+import argparse
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import List, Type
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.util.sevenzip import SevenZipUtil
+from auto_unpack.util.sevenzip.builtin import BuiltinSevenZipUtil
+
+
+def create_archives(dir_path: Path, count: int) -> List[Path]:
+    """
+    生成测试用的小压缩包
+
+    :param dir_path: 存放目录
+    :param count: 压缩包数量
+    :return: 压缩包路径列表
+    """
+    archives = []
+    for i in range(count):
+        archive = dir_path / f"tiny-{i}.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("hello.txt", f"hello {i}\n")
+        archives.append(archive)
+    return archives
+
+
+def bench(util: Type[SevenZipUtil], archives: List[Path], sub: str) -> float:
+    """
+    测试每秒处理的压缩包数量
+
+    :param util: 7zip 工具类
+    :param archives: 压缩包路径列表
+    :param sub: 操作 list/test
+    :return: 每秒处理数量
+    """
+    func = util.list if sub == "list" else util.test
+    start = time.perf_counter()
+    for archive in archives:
+        result = func(archive)
+        assert result.code.value[0] == 0, result.message
+    return len(archives) / (time.perf_counter() - start)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 压缩包处理后端性能测试(7zip 命令行 vs 内置库)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=2000, help="压缩包数量")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archives = create_archives(Path(temp_dir), args.count)
+        print(f"archives: {args.count} tiny zip files")
+
+        for sub in ["list", "test"]:
+            for name, util in [
+                ("7zip", SevenZipUtil),
+                ("builtin", BuiltinSevenZipUtil),
+            ]:
+                rate = bench(util, archives, sub)
+                print(f"{sub:<5} {name:<8} {rate:>10.1f} archives/s")
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比 7zip 命令行与内置库后端处理大量小压缩包的速度
+
+    python -m script.benchmark.backend -n 2000
+    """
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.util.exec import exec_cmd
+from auto_unpack.util.sevenzip import SevenZipUtil
+
+
+def exec_cmd_shell(cmds: List[str], decode: str = "utf-8") -> Tuple[int, str]:
+    """
+    旧版调用方式: 拼接命令字符串, 经过 shell 启动, 一次性读取全部输出
+
+    :param cmds: 命令(已转义)
+    :param decode: 编码格式
+    :return: 状态码，返回信息
+    """
+    with subprocess.Popen(
+        " ".join(cmds),
+        stdin=None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=True,
+    ) as proc:
+        info, _ = proc.communicate()
+        return proc.returncode, info.decode(decode, errors="ignore")
+
+
+def bench(func: Callable[[], Tuple[int, str]], count: int) -> float:
+    """
+    测试每秒调用次数
+
+    :param func: 调用函数
+    :param count: 调用次数
+    :return: 每秒调用次数
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        code, _ = func()
+        assert code == 0
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 命令调用性能测试(shell 字符串 vs 参数列表)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=500, help="调用次数")
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        default=Path("archive/base/hello.7z"),
+        help="测试使用的压缩包",
+    )
+    args = parser.parse_args()
+
+    lib_path = str(SevenZipUtil._lib_path)
+    file_path = str(args.file)
+
+    shell_cmds = [f'"{lib_path}"', "l", f'"{file_path}"', '-p""', "-y"]
+    argv_cmds = [lib_path, "l", file_path, "-p", "-y"]
+
+    before = bench(lambda: exec_cmd_shell(shell_cmds), args.count)
+    after = bench(lambda: exec_cmd(argv_cmds), args.count)
+
+    print(f"7z list x {args.count}: {file_path}")
+    print(f"before (shell=True) {before:>10.1f} calls/s")
+    print(f"after  (argv)       {after:>10.1f} calls/s")
+    print(f"speedup             {after / before:>10.2f}x")
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比 shell 字符串与参数列表两种方式调用 7-zip 的速度
+
+    python -m script.benchmark.exec -n 500
+    """
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.util.sevenzip.result import ListResult, ResultCode, TechnicalParser
+
+HEADER = """
+7-Zip (z) 23.01 (x64) : Copyright (c) 1999-2023 Igor Pavlov : 2023-06-20
+
+Listing archive: bench.7z
+
+--
+Path = bench.7z
+Type = 7z
+Physical Size = 1024
+
+----------"""
+
+BLOCK = """Path = dir{dir}/file{index}.txt
+Folder = -
+Size = {index}
+Packed Size = {index}
+Modified = 2024-01-01 00:00:00
+Attributes = A
+Encrypted = +
+"""
+
+
+def iter_lines(count: int) -> Iterator[str]:
+    """
+    生成模拟的 7z l -slt 输出行
+
+    :param count: 文件数
+    :return: 输出行迭代器
+    """
+    yield from HEADER.splitlines()
+    for index in range(count):
+        yield from BLOCK.format(dir=index % 100, index=index).splitlines()
+        yield ""
+
+
+def parse_full(count: int) -> int:
+    """
+    旧版: 缓存完整输出后正则解析为 ListResult
+
+    :param count: 文件数
+    :return: 最小加密文件大小
+    """
+    message = "\n".join(iter_lines(count))
+    result = ListResult(
+        message=message,
+        file_path=Path("bench.7z"),
+        password="",
+        code=ResultCode.NO_ERROR,
+    )
+    return min(f.size for f in result.files if f.encrypted)
+
+
+def parse_stream(count: int) -> int:
+    """
+    新版: 逐行增量解析
+
+    :param count: 文件数
+    :return: 最小加密文件大小
+    """
+    parser = TechnicalParser()
+    entries = (parser.feed(line) for line in iter_lines(count))
+    return min(e.size for e in entries if e is not None and e.encrypted)
+
+
+def bench(func: Callable[[int], int], count: int) -> Tuple[float, float]:
+    """
+    测试耗时与内存峰值
+
+    :param func: 解析函数
+    :param count: 文件数
+    :return: (耗时 s, 内存峰值 MB)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(count)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 文件列表解析性能测试(完整解析 vs 流式解析)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=100000, help="文件数")
+    args = parser.parse_args()
+
+    before_time, before_peak = bench(parse_full, args.count)
+    after_time, after_peak = bench(parse_stream, args.count)
+
+    print(f"7z l -slt entries: {args.count}")
+    print(f"before (full)   {before_time:>8.2f} s {before_peak:>10.1f} MB")
+    print(f"after  (stream) {after_time:>8.2f} s {after_peak:>10.1f} MB")
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比完整解析与流式解析 7-zip 文件列表输出的耗时与内存峰值
+
+    python -m script.benchmark.list -n 100000
+    """
+    main()
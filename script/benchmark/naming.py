@@ -0,0 +1,97 @@
+import argparse
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+from typing import Callable
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.util.file import PathReserver, get_next_not_exist_path
+
+
+def reserve_legacy(output_dir: Path, count: int, threads: int):
+    """
+    旧版: 全局锁 + 逐个判断 name, name(1), name(2)... 是否存在
+
+    :param output_dir: 输出目录
+    :param count: 同名压缩包数量
+    :param threads: 线程数
+    """
+    lock = threading.Lock()
+
+    def reserve(_: int):
+        with lock:
+            get_next_not_exist_path(output_dir / "data").mkdir()
+
+    with ThreadPool(threads) as pool:
+        pool.map(reserve, range(count))
+
+
+def reserve_reserver(output_dir: Path, count: int, threads: int):
+    """
+    新版: mkdir 原子预留 + 每个名称的序号计数器
+
+    :param output_dir: 输出目录
+    :param count: 同名压缩包数量
+    :param threads: 线程数
+    """
+    reserver = PathReserver()
+
+    def reserve(_: int):
+        reserver.reserve(output_dir / "data")
+
+    with ThreadPool(threads) as pool:
+        pool.map(reserve, range(count))
+
+
+def bench(func: Callable[[Path, int, int], None], count: int, threads: int) -> float:
+    """
+    测试耗时
+
+    :param func: 预留函数
+    :param count: 同名压缩包数量
+    :param threads: 线程数
+    :return: 耗时 s
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        func(Path(temp_dir), count, threads)
+        elapsed = time.perf_counter() - start
+        assert len(list(Path(temp_dir).iterdir())) == count
+    return elapsed
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 输出目录命名性能测试(全局锁逐个探测 vs 原子预留)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument(
+        "-n",
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[500, 1000, 2000],
+        help="同名压缩包数量(可指定多个, 观察耗时增长)",
+    )
+    parser.add_argument("-t", "--threads", type=int, default=8, help="线程数")
+    args = parser.parse_args()
+
+    print(f"{'archives':>8} {'legacy (s)':>12} {'reserver (s)':>14} {'speedup':>10}")
+    for count in args.counts:
+        before = bench(reserve_legacy, count, args.threads)
+        after = bench(reserve_reserver, count, args.threads)
+        print(f"{count:>8} {before:>12.3f} {after:>14.3f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比解压结果同名(如多个目录下的 data.zip)时, 两种输出目录命名方式随数量增长的耗时
+
+    python -m script.benchmark.naming -n 500 1000 2000 -t 8
+    """
+    main()
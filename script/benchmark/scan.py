@@ -0,0 +1,127 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.plugin import PluginGlobalConfig
+from auto_unpack.plugins.scan import ScanPlugin, ScanPluginConfig
+from auto_unpack.store import DataStore, FileData, paths_excludes
+
+# 文件后缀(依次循环)
+SUFFIXES = [".zip", ".7z", ".rar", ".txt", ".jpg", ".mp4", ".pdf", ".doc"]
+
+
+def create_tree(dir_path: Path, count: int, skip_every: int):
+    """
+    生成测试目录树(两层目录, 每个目录 100 个空文件)
+
+    :param dir_path: 存放目录
+    :param count: 文件数
+    :param skip_every: 每隔多少个目录生成一个 skip 目录(其下文件均应被排除)
+    """
+    for i in range(0, count, 100):
+        index = i // 100
+        name = "skip" if skip_every > 0 and index % skip_every == 0 else "d"
+        sub_dir = dir_path / f"a{index // 100}" / f"{name}{index % 100}"
+        sub_dir.mkdir(parents=True, exist_ok=True)
+        sub_dir_str = str(sub_dir)
+        for j in range(i, min(i + 100, count)):
+            name = f"f{j}{SUFFIXES[j % len(SUFFIXES)]}"
+            os.close(os.open(os.path.join(sub_dir_str, name), os.O_CREAT | os.O_WRONLY))
+
+
+def scan_legacy(
+    dir_path: Path, includes: List[str], excludes: List[str]
+) -> List[FileData]:
+    """
+    旧版: 每个包含规则 rglob 一次 + is_file + 逐个创建 FileData + 逐个匹配排除规则
+
+    :param dir_path: 扫描目录
+    :param includes: 包含规则
+    :param excludes: 排除规则
+    :return: 文件数据列表
+    """
+    file_datas = []
+    for include in includes:
+        for f in dir_path.rglob(include):
+            if not f.is_file():
+                continue
+            file_datas.append(FileData(path=f, search_path=dir_path))
+    return paths_excludes(file_datas, excludes)
+
+
+def scan_plugin(
+    dir_path: Path, includes: List[str], excludes: List[str]
+) -> List[FileData]:
+    """
+    新版: 扫描插件(os.scandir 一次遍历, 合并匹配规则, 跳过排除目录)
+
+    :param dir_path: 扫描目录
+    :param includes: 包含规则
+    :param excludes: 排除规则
+    :return: 文件数据列表
+    """
+    store = DataStore()
+    config = ScanPluginConfig(dir=dir_path, includes=includes, excludes=excludes)
+    plugin = ScanPlugin(config, store, PluginGlobalConfig(info_dir=Path("info")), None)
+    plugin.execute()
+    return store.load_context(config.save_key).file_datas
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 文件扫描性能测试(多次 rglob vs os.scandir 一次遍历)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000000, help="文件数")
+    parser.add_argument(
+        "-i",
+        "--includes",
+        nargs="+",
+        default=["**/*.zip", "**/*.7z", "**/*.rar"],
+        help="包含规则",
+    )
+    parser.add_argument(
+        "-e", "--excludes", nargs="*", default=["*/skip*"], help="排除规则"
+    )
+    parser.add_argument(
+        "-s",
+        "--skip-every",
+        type=int,
+        default=10,
+        help="每隔多少个目录生成一个 skip 目录",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=".") as temp_dir:
+        temp_path = Path(temp_dir)
+        start = time.perf_counter()
+        create_tree(temp_path, args.count, args.skip_every)
+        elapsed = time.perf_counter() - start
+        print(f"files: {args.count} (created in {elapsed:.1f} s)")
+        print(f"includes: {args.includes} excludes: {args.excludes}")
+
+        results = []
+        for name, func in [("legacy", scan_legacy), ("plugin", scan_plugin)]:
+            start = time.perf_counter()
+            file_datas = func(temp_path, args.includes, args.excludes)
+            elapsed = time.perf_counter() - start
+            results.append({f.path for f in file_datas})
+            print(f"{name:<8} {elapsed:>8.2f} s {len(file_datas):>10} files")
+
+        assert results[0] == results[1], "Scan results mismatch"
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比每个包含规则 rglob 一次与 os.scandir 一次遍历扫描大型目录树的耗时
+
+    python -m script.benchmark.scan -n 1000000
+    """
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from auto_unpack import constant
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.plugin import PluginGlobalConfig
+from auto_unpack.plugins.archive import ArchivePlugin, ArchivePluginConfig
+from auto_unpack.store import Context, DataStore, FileData
+
+# 进程 I/O 统计(包含已结束的子进程, 即 7-zip)
+PROC_IO_PATH = Path("/proc/self/io")
+
+
+def get_written_bytes() -> int:
+    """
+    获取当前进程(含已结束的子进程)调用 write 等写入的字节数
+
+    :return: 字节数
+    """
+    for line in PROC_IO_PATH.read_text().splitlines():
+        key, value = line.split(":")
+        if key == "wchar":
+            return int(value)
+    return 0
+
+
+def create_archives(dir_path: Path, count: int, size: int) -> List[Path]:
+    """
+    生成测试用的压缩包(不压缩, 随机数据)
+
+    :param dir_path: 存放目录
+    :param count: 压缩包数量
+    :param size: 每个压缩包内文件大小(字节)
+    :return: 压缩包路径列表
+    """
+    archives = []
+    for i in range(count):
+        archive = dir_path / f"data-{i}.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr("data.bin", os.urandom(size))
+        archives.append(archive)
+    return archives
+
+
+def extract(
+    archives: List[Path], output_dir: Path, staging_dir: Optional[Path]
+) -> Tuple[int, float]:
+    """
+    使用压缩包处理插件解压
+
+    :param archives: 压缩包路径列表
+    :param output_dir: 输出目录
+    :param staging_dir: 暂存目录(null: 自动选择)
+    :return: (写入字节数, 耗时 s)
+    """
+    password_path = archives[0].parent / "passwords.txt"
+    password_path.write_text("")
+
+    store = DataStore()
+    file_datas = [FileData(path=a, search_path=a.parent) for a in archives]
+    store.save_context(constant.CONTEXT_DEFAULT_KEY, Context(file_datas=file_datas))
+
+    config = ArchivePluginConfig(
+        mode="extract",
+        password_path=password_path,
+        output_dir=output_dir,
+        staging_dir=staging_dir,
+        thread_max=1,
+    )
+    plugin = ArchivePlugin(
+        config, store, PluginGlobalConfig(info_dir=output_dir / "info"), None
+    )
+
+    before = get_written_bytes()
+    start = time.perf_counter()
+    plugin.execute()
+    elapsed = time.perf_counter() - start
+    return get_written_bytes() - before, elapsed
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 解压暂存目录性能测试(跨文件系统复制 vs 同文件系统重命名)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=10, help="压缩包数量")
+    parser.add_argument(
+        "-s", "--size", type=int, default=16, help="每个压缩包内文件大小(MB)"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("/dev/shm"),
+        help="输出目录所在位置(应与当前目录位于不同文件系统)",
+    )
+    args = parser.parse_args()
+
+    extracted = args.count * args.size * 1024 * 1024
+    cases = [
+        ("cross-device (.cache)", Path(".cache")),
+        ("same-device (auto)", None),
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archives = create_archives(Path(temp_dir), args.count, args.size * 1024 * 1024)
+        print(f"archives: {args.count} x {args.size} MB, output under `{args.output}`")
+
+        for name, staging_dir in cases:
+            output_dir = Path(tempfile.mkdtemp(dir=args.output))
+            try:
+                written, elapsed = extract(archives, output_dir, staging_dir)
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            ratio = written / extracted
+            print(
+                f"{name:<24} {ratio:>6.2f} bytes written per extracted byte "
+                f"{elapsed:>8.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比解压暂存目录与输出目录位于不同/相同文件系统时, 每解压 1 字节实际写入的字节数
+
+    python -m script.benchmark.staging -n 10 -s 16 -o /dev/shm
+    """
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.plugin import PluginGlobalConfig
+from auto_unpack.plugins.transfer import TransferPlugin, TransferPluginConfig
+from auto_unpack.store import Context, DataStore, FileData
+from auto_unpack.util.file import get_next_not_exist_path, path_equal
+
+
+def create_files(dir_path: Path, count: int, size: int) -> List[FileData]:
+    """
+    生成测试文件(每个目录 100 个文件)
+
+    :param dir_path: 存放目录
+    :param count: 文件数
+    :param size: 文件大小(字节)
+    :return: 文件数据列表
+    """
+    data = os.urandom(size)
+    file_datas = []
+    for i in range(count):
+        file_path = dir_path / f"dir{i // 100}" / f"file{i}.bin"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+        file_datas.append(FileData(path=file_path, search_path=dir_path))
+    return file_datas
+
+
+def transfer_legacy(file_datas: List[FileData], target_dir: Path):
+    """
+    旧版: 单线程逐个复制, 每个文件 mkdir + path_equal + exists + shutil.copy
+
+    :param file_datas: 文件数据列表
+    :param target_dir: 目标目录
+    """
+    for file in file_datas:
+        target_path = target_dir / file.relative_path
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if not path_equal(target_path, file.path):
+            if target_path.exists():
+                target_path = get_next_not_exist_path(target_path)
+            shutil.copy(file.path, target_path)
+
+
+def move_legacy(file_datas: List[FileData], target_dir: Path):
+    """
+    旧版移动: 单线程逐个 shutil.move(跨设备时复制后删除, 无同步, 中断后无法续传)
+
+    :param file_datas: 文件数据列表
+    :param target_dir: 目标目录
+    """
+    for file in file_datas:
+        target_path = target_dir / file.relative_path
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(file.path), str(target_path))
+
+
+def transfer_plugin(
+    file_datas: List[FileData], target_dir: Path, threads: int, mode: str = "copy"
+):
+    """
+    新版: 转移插件(目标目录只创建一次, 并发复制, copy_file_range/sendfile)
+
+    :param file_datas: 文件数据列表
+    :param target_dir: 目标目录
+    :param threads: 线程数
+    :param mode: 转移模式
+    """
+    store = DataStore()
+    store.save_context("default", Context(file_datas=file_datas))
+    config = TransferPluginConfig(mode=mode, target_dir=target_dir, thread_max=threads)
+    plugin = TransferPlugin(
+        config, store, PluginGlobalConfig(info_dir=Path("info")), None
+    )
+    plugin.execute()
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 文件转移性能测试(单线程逐个复制 vs 并发批量复制)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("-n", "--count", type=int, default=20000, help="文件数")
+    parser.add_argument("-s", "--size", type=int, default=16, help="文件大小(KB)")
+    parser.add_argument("-t", "--threads", type=int, default=4, help="线程数")
+    parser.add_argument(
+        "-m", "--move-dir", type=Path, help="跨设备移动的目标目录(如 /dev/shm, 可选)"
+    )
+    args = parser.parse_args()
+
+    total_mb = args.count * args.size / 1024
+
+    with tempfile.TemporaryDirectory(dir=".") as temp_dir:
+        temp_path = Path(temp_dir)
+        file_datas = create_files(temp_path / "src", args.count, args.size * 1024)
+        print(f"files: {args.count} x {args.size} KB ({total_mb:.1f} MB)")
+
+        cases = [
+            ("legacy", lambda d: transfer_legacy(file_datas, d)),
+            ("plugin", lambda d: transfer_plugin(file_datas, d, args.threads)),
+        ]
+        for name, func in cases:
+            target_dir = temp_path / name
+            start = time.perf_counter()
+            func(target_dir)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<11} {elapsed:>8.2f} s {total_mb / elapsed:>10.1f} MB/s")
+
+        if args.move_dir is None:
+            return
+
+        # 移动会删除源文件, 每种方式重新生成
+        cases = [
+            ("move-legacy", move_legacy),
+            ("move-plugin", lambda f, d: transfer_plugin(f, d, args.threads, "move")),
+        ]
+        for name, func in cases:
+            src_dir = temp_path / name
+            file_datas = create_files(src_dir, args.count, args.size * 1024)
+            with tempfile.TemporaryDirectory(dir=args.move_dir) as move_dir:
+                start = time.perf_counter()
+                func(file_datas, Path(move_dir))
+                elapsed = time.perf_counter() - start
+            print(f"{name:<11} {elapsed:>8.2f} s {total_mb / elapsed:>10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比单线程逐个复制/移动与转移插件并发批量复制/移动大量文件的耗时与吞吐量
+
+    python -m script.benchmark.transfer -n 20000 -s 16 -t 4 -m /dev/shm
+    """
+    main()
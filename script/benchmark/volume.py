@@ -0,0 +1,180 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from auto_unpack.args import CustomHelpFormatter
+from auto_unpack.plugin import PluginGlobalConfig
+from auto_unpack.plugins.archive import (
+    ArchiveFile,
+    ArchiveInfo,
+    ArchiveInfoStatus,
+    ArchivePlugin,
+    ArchivePluginConfig,
+)
+from auto_unpack.store import DataStore, FileData
+from auto_unpack.util.file import is_path_in_includes, path_equal
+from auto_unpack.util.sevenzip.result import Attr, ListResult, ResultCode
+
+
+def create_archive_files(dir_path: Path, count: int, parts: int) -> List[ArchiveFile]:
+    """
+    生成模拟的分卷压缩包(.partN.rar), 主卷已识别成功, 子卷待标记
+
+    :param dir_path: 存放目录
+    :param count: 分卷压缩包数量
+    :param parts: 每个压缩包的分卷数
+    :return: 压缩包文件列表
+    """
+    archive_files: List[ArchiveFile] = []
+    for i in range(count):
+        volumes = [dir_path / f"archive-{i}.part{p}.rar" for p in range(1, parts + 1)]
+        for volume in volumes:
+            volume.touch()
+
+        for volume in volumes:
+            archive_file = ArchiveFile(
+                status=ArchiveInfoStatus.INIT,
+                path=volume,
+                file_data=FileData(path=volume, search_path=dir_path),
+                resolved_path=str(volume.resolve()),
+            )
+            if volume == volumes[0]:
+                archive_file.status = ArchiveInfoStatus.LIST_SUCCESS
+                archive_file.info = ArchiveInfo(
+                    attr=Attr(type="Rar5"),
+                    is_volume=True,
+                    volumes=volumes,
+                    main_path=volume,
+                )
+                archive_file.info_result = ListResult(
+                    message="",
+                    file_path=volume,
+                    password="",
+                    code=ResultCode.NO_ERROR,
+                    attr=archive_file.info.attr,
+                    is_volume=True,
+                )
+            archive_files.append(archive_file)
+    return archive_files
+
+
+def mark_volumes_legacy(archive_files: List[ArchiveFile]):
+    """
+    旧版: 跳过已识别分卷(any 扫描) + 双重循环标记分卷子卷
+
+    :param archive_files: 压缩包文件列表
+    """
+    success_archive_files = [
+        c for c in archive_files if c.status == ArchiveInfoStatus.LIST_SUCCESS
+    ]
+    for archive_file in archive_files:
+        any(
+            c
+            for c in success_archive_files
+            if is_path_in_includes(archive_file.path, c.info.volumes)
+        )
+
+    for archive_file in archive_files:
+        if archive_file.status != ArchiveInfoStatus.LIST_SUCCESS:
+            continue
+        if (
+            not path_equal(archive_file.info.main_path, archive_file.path)
+            or len(archive_file.info.volumes) < 2
+        ):
+            continue
+        for archive_file_item in archive_files:
+            if archive_file_item == archive_file:
+                continue
+            if not is_path_in_includes(
+                archive_file_item.path, archive_file.info.volumes
+            ):
+                continue
+            archive_file_item.status = ArchiveInfoStatus.LIST_VOLUME
+            archive_file_item.info = archive_file.info.model_copy()
+            archive_file_item.info_result = archive_file.info_result.model_copy()
+            archive_file_item.error = None
+
+
+def mark_volumes_index(plugin: ArchivePlugin, archive_files: List[ArchiveFile]):
+    """
+    新版: 绝对路径索引
+
+    :param plugin: 压缩包处理插件
+    :param archive_files: 压缩包文件列表
+    """
+    included_paths = set()
+    for archive_file in archive_files:
+        if archive_file.status == ArchiveInfoStatus.LIST_SUCCESS:
+            included_paths.update(str(p.resolve()) for p in archive_file.info.volumes)
+    for archive_file in archive_files:
+        _ = archive_file.resolved_path in included_paths
+
+    plugin.archive_files = archive_files
+    plugin._mark_volumes()
+
+
+def bench(func: Callable[[List[ArchiveFile]], None], files: List[ArchiveFile]):
+    """
+    测试耗时
+
+    :param func: 标记函数
+    :param files: 压缩包文件列表
+    :return: 耗时 s
+    """
+    for archive_file in files:
+        if archive_file.status == ArchiveInfoStatus.LIST_VOLUME:
+            archive_file.status = ArchiveInfoStatus.INIT
+    start = time.perf_counter()
+    func(files)
+    elapsed = time.perf_counter() - start
+    volume_count = sum(f.status == ArchiveInfoStatus.LIST_VOLUME for f in files)
+    return elapsed, volume_count
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="auto-unpack 分卷去重性能测试(双重循环 vs 路径索引)",
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument(
+        "-n",
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[25, 50, 100, 200],
+        help="分卷压缩包数量(可指定多个, 观察耗时增长)",
+    )
+    parser.add_argument("-p", "--parts", type=int, default=5, help="每个压缩包分卷数")
+    args = parser.parse_args()
+
+    plugin = ArchivePlugin(
+        ArchivePluginConfig(mode="list"),
+        DataStore(),
+        PluginGlobalConfig(info_dir=Path("info")),
+        None,
+    )
+
+    print(f"{'files':>8} {'legacy (s)':>12} {'index (s)':>12} {'speedup':>10}")
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = create_archive_files(Path(temp_dir), count, args.parts)
+            before, before_count = bench(mark_volumes_legacy, files)
+            after, after_count = bench(lambda f: mark_volumes_index(plugin, f), files)
+            assert before_count == after_count == count * (args.parts - 1)
+            print(
+                f"{len(files):>8} {before:>12.3f} {after:>12.3f} {before / after:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    """
+    此脚本用于对比分卷去重的双重循环与路径索引两种实现随文件数增长的耗时
+
+    python -m script.benchmark.volume -n 25 50 100 200 -p 5
+    """
+    main()